@@ -0,0 +1,147 @@
+#!/usr/bin/env python
+
+"""Micro-benchmarks for performance sensitive parts of cppclean."""
+
+from __future__ import absolute_import
+from __future__ import print_function
+
+import timeit
+
+from cpp import ast
+from cpp import metrics
+from cpp import symbols
+from cpp import tokenize
+
+
+def _best_time(function, number):
+    """Return the best time in seconds of a single call to function."""
+    return min(timeit.repeat(function, number=number, repeat=3)) / number
+
+
+def benchmark_nested_templates():
+    converter = ast.TypeConverter([])
+    for depth in (1, 10, 50, 200, 800):
+        tokens = list(tokenize.get_tokens(
+            'Foo<' * depth + 'int' + '>' * depth))
+
+        seconds = _best_time(lambda: converter.to_type(tokens),
+                             max(1, 2000 // depth))
+        print('to_type() nesting depth {:4d}: {:10.1f} us'.format(
+            depth, seconds * 1e6))
+
+    tokens = list(tokenize.get_tokens(
+        'map<string, vector<pair<int, shared_ptr<Foo> > > >'))
+    seconds = _best_time(lambda: converter.to_type(tokens), 10000)
+    print('to_type() map<string, vector<pair<...> > >: {:.1f} us'.format(
+        seconds * 1e6))
+
+
+def benchmark_line_numbers():
+    source = 'int variable;\n' * 100000
+    indexes = list(range(0, len(source), len(source) // 5000))
+
+    def get_line_numbers():
+        lines = metrics.Metrics(source)
+        for index in indexes:
+            lines.get_line_number(index)
+
+    seconds = _best_time(get_line_numbers, 1)
+    print('get_line_number() {} lookups in {} lines: {:.1f} ms'.format(
+        len(indexes), source.count('\n'), seconds * 1e3))
+
+    seconds = _best_time(
+        lambda: metrics.Metrics(source).get_line_numbers(indexes), 1)
+    print('get_line_numbers() {} lookups in {} lines: {:.1f} ms'.format(
+        len(indexes), source.count('\n'), seconds * 1e3))
+
+
+def _find_in_namespace(parts, namespace):
+    for part in parts:
+        namespace = namespace.get(part)
+        if namespace is None:
+            break
+        if not isinstance(namespace, dict):
+            return namespace
+    return None
+
+
+def _nested_lookup_symbol(table, name, namespace_stack):
+    """The lookup of SymbolTable.lookup_symbol() before find_symbol(),
+    which walked the nested namespace dicts of each table."""
+    all_namespaces = [table.namespaces] + [layer.namespaces
+                                           for layer
+                                           in reversed(table.layers)]
+    parts = name.split('::')
+    if parts[0] == '':
+        parts = parts[1:]
+    elif namespace_stack is not None:
+        namespace_stacks = []
+        for namespace in all_namespaces:
+            stack = []
+            for current in namespace_stack:
+                namespace = namespace.get(current)
+                if namespace is None or not isinstance(namespace, dict):
+                    break
+                stack.append(namespace)
+            namespace_stacks.append(stack)
+        for depth in reversed(range(len(namespace_stack))):
+            for stack in namespace_stacks:
+                if depth < len(stack):
+                    result = _find_in_namespace(parts, stack[depth])
+                    if result is not None:
+                        return result
+
+    for namespaces in all_namespaces:
+        namespace = namespaces
+        if len(parts) == 1:
+            namespace = namespaces[None]
+        result = _find_in_namespace(parts, namespace)
+        if result is not None:
+            return result
+    for namespaces in all_namespaces:
+        result = _find_in_namespace(parts, namespaces[None])
+        if result is not None:
+            return result
+    return None
+
+
+def benchmark_symbol_lookups():
+    # The symbol table of a file that #includes 30 headers.
+    table = symbols.SymbolTable()
+    for header in range(30):
+        layer = symbols.SymbolTable()
+        for i in range(300):
+            layer.add_symbol('Class{}'.format(i), ['ns{}'.format(header)],
+                             object(), header)
+        table.add_layer(layer)
+    hits = [('Class{}'.format(i), ['ns{}'.format(i % 30)])
+            for i in range(1000)]
+    misses = [('local{}'.format(i), ['ns{}'.format(i % 30)])
+              for i in range(1000)]
+
+    def find_symbols(lookups):
+        for name, namespace in lookups:
+            table.find_symbol(name, namespace)
+
+    def nested_lookups(lookups):
+        for name, namespace in lookups:
+            _nested_lookup_symbol(table, name, namespace)
+
+    for percent in (100, 50, 0):
+        lookups = hits[:percent * 10] + misses[:1000 - percent * 10]
+        assert ([table.find_symbol(n, ns) for n, ns in lookups] ==
+                [_nested_lookup_symbol(table, n, ns) for n, ns in lookups])
+        for function in (find_symbols, nested_lookups):
+            seconds = _best_time(lambda: function(lookups), 10)
+            print('{}() {:3d}% hits: {:8.0f} lookups/s'.format(
+                function.__name__[:-1], percent, len(lookups) / seconds))
+
+
+def main():
+    benchmark_nested_templates()
+    benchmark_line_numbers()
+    benchmark_symbol_lookups()
+
+
+if __name__ == '__main__':
+    main()
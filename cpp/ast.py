@@ -54,6 +54,9 @@ FUNCTION_ATTRIBUTE = 0x20
 FUNCTION_UNKNOWN_ANNOTATION = 0x40
 FUNCTION_THROW = 0x80
 
+# Marks a lazily converted attribute that has not been computed yet.
+_NOT_CONVERTED = object()
+
 
 class ParseError(Exception):
 
@@ -273,14 +276,41 @@ class Function(_GenericDeclaration):
     def __init__(self, start, end, name, return_type, parameters,
                  specializations, modifiers, templated_types, body, namespace):
         _GenericDeclaration.__init__(self, start, end, name, namespace)
-        converter = TypeConverter(namespace)
-        self.return_type = converter.create_return_type(return_type)
-        self.parameters = converter.to_parameters(parameters)
-        self.specializations = converter.to_type(specializations)
+        # Most functions are never inspected beyond their name, so the
+        # token sequences are only converted on first access.
+        self.return_type_tokens = return_type
+        self.parameter_tokens = parameters
+        self.specialization_tokens = specializations
+        self._return_type = _NOT_CONVERTED
+        self._parameters = _NOT_CONVERTED
+        self._specializations = _NOT_CONVERTED
         self.modifiers = modifiers
         self.body = body
         self.templated_types = templated_types
 
+    @property
+    def return_type(self):
+        if self._return_type is _NOT_CONVERTED:
+            converter = TypeConverter(self.namespace)
+            self._return_type = converter.create_return_type(
+                self.return_type_tokens)
+        return self._return_type
+
+    @property
+    def parameters(self):
+        if self._parameters is _NOT_CONVERTED:
+            converter = TypeConverter(self.namespace)
+            self._parameters = converter.to_parameters(self.parameter_tokens)
+        return self._parameters
+
+    @property
+    def specializations(self):
+        if self._specializations is _NOT_CONVERTED:
+            converter = TypeConverter(self.namespace)
+            self._specializations = converter.to_type(
+                self.specialization_tokens)
+        return self._specializations
+
     def is_declaration(self):
         return self.body is None
 
@@ -288,11 +318,10 @@ class Function(_GenericDeclaration):
         return self.body is not None
 
     def is_exportable(self):
-        if self.return_type:
-            if (
-                'static' in self.return_type.modifiers or
-                'constexpr' in self.return_type.modifiers
-            ):
+        # Inspect the tokens so as not to convert the return type of every
+        # function.
+        for token in self.return_type_tokens or ():
+            if token.name in ('static', 'constexpr'):
                 return False
         return None not in self.namespace
 
@@ -367,6 +396,42 @@ class Type(_GenericDeclaration):
         return False
 
 
+class _TypeListBuilder(object):
+
+    """State for one nesting level of TypeConverter.to_type()."""
+
+    def __init__(self, template_start):
+        # Index of the '<' that opened this level, None at the top level.
+        self.template_start = template_start
+        self.result = []
+        self.name_tokens = []
+        self.templated_types = None
+        self.reference = self.pointer = self.array = False
+        self.inside_array = False
+        self.empty_array = True
+
+    def add_type(self):
+        name_tokens = self.name_tokens
+        if not name_tokens:
+            return
+
+        # Partition tokens into name and modifier tokens.
+        names = []
+        modifiers = []
+        for t in name_tokens:
+            if keywords.is_keyword(t.name):
+                modifiers.append(t.name)
+            else:
+                names.append(t.name)
+        name = ''.join(names)
+
+        self.result.append(Type(name_tokens[0].start, name_tokens[-1].end,
+                                name, self.templated_types or [], modifiers,
+                                self.reference, self.pointer, self.array))
+        self.name_tokens = []
+        self.templated_types = None
+
+
 class TypeConverter(object):
 
     def __init__(self, namespace_stack):
@@ -393,6 +458,67 @@ class TypeConverter(object):
         Returns:
           [Class(...), ...]
 
+        """
+        # Pair every '>' with its '<' up front. Nested templates can then be
+        # converted in a single pass with an explicit stack rather than by
+        # rescanning and recursing once per nesting level.
+        openers = []
+        template_starts = {}
+        for i, token in enumerate(tokens):
+            if token.name == '<':
+                openers.append(i)
+            elif token.name == '>' and openers:
+                template_starts[i] = openers.pop()
+        if openers:
+            return self._to_type_unbalanced(tokens)
+
+        stack = []
+        builder = _TypeListBuilder(None)
+        for i, token in enumerate(tokens):
+            name = token.name
+            if (
+                name == '>' and
+                stack and
+                template_starts.get(i) == builder.template_start
+            ):
+                builder.add_type()
+                templated_types = builder.result
+                builder = stack.pop()
+                builder.templated_types = templated_types
+            elif name == ']':
+                builder.inside_array = False
+                if builder.empty_array:
+                    builder.pointer = True
+                else:
+                    builder.array = True
+            elif builder.inside_array:
+                builder.empty_array = False
+            elif name == '<':
+                stack.append(builder)
+                builder = _TypeListBuilder(i)
+            elif name == ',' or name == '(':
+                builder.add_type()
+                builder.reference = builder.pointer = builder.array = False
+                builder.empty_array = True
+            elif name == '*':
+                builder.pointer = True
+            elif name == '&':
+                builder.reference = True
+            elif name == '[':
+                builder.inside_array = True
+            elif name != ')':
+                builder.name_tokens.append(token)
+
+        builder.add_type()
+        return builder.result
+
+    def _to_type_unbalanced(self, tokens):
+        """Helper for to_type() when some '<' is never closed.
+
+        The content of an unclosed template runs to the end of the tokens,
+        which cannot be expressed with a matching pass, so this rescans the
+        tokens of each template.
+
         """
         result = []
         name_tokens = []
@@ -614,7 +740,7 @@ class TypeConverter(object):
 class ASTBuilder(object):
 
     def __init__(self, token_stream, filename, in_class=None,
-                 namespace_stack=None, quiet=False):
+                 namespace_stack=None, quiet=False, limits=None):
         if namespace_stack is None:
             namespace_stack = []
 
@@ -625,6 +751,8 @@ class ASTBuilder(object):
         self.namespaces = []
         self.define = set()
         self.quiet = quiet
+        # limits.Limits of the time spent on parsing, or None.
+        self.limits = limits
         self.in_class = in_class
         if in_class:
             self.namespaces.append(False)
@@ -841,6 +969,8 @@ class ASTBuilder(object):
         return self._get_matching_char('{', '}')
 
     def _get_next_token(self):
+        if self.limits is not None:
+            self.limits.check_time()
         if self.token_queue:
             return self.token_queue.pop()
         return next(self.tokens)
@@ -1482,7 +1612,8 @@ class ASTBuilder(object):
             name = class_name or '__unamed__'
             ast = ASTBuilder(self.get_scope(), self.filename, name,
                              self.namespace_stack,
-                             quiet=self.quiet)
+                             quiet=self.quiet,
+                             limits=self.limits)
             body = list(ast.generate())
 
             if not self._handling_typedef:
@@ -1547,20 +1678,22 @@ class ASTBuilder(object):
         pass
 
 
-def builder_from_source(source, filename, quiet=False):
+def builder_from_source(source, filename, quiet=False, limits=None):
     """Utility method that returns an ASTBuilder from source code.
 
     Args:
       source: 'C++ source code'
       filename: 'file1'
+      limits: limits.Limits of tokenizing and parsing, or None
 
     Returns:
       ASTBuilder
 
     """
-    return ASTBuilder(tokenize.get_tokens(source),
+    return ASTBuilder(tokenize.get_tokens(source, limits),
                       filename,
-                      quiet=quiet)
+                      quiet=quiet,
+                      limits=limits)
 
 
 def assert_parse(value, message):
@@ -0,0 +1,101 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Suppress known warnings listed in a baseline file.
+
+A baseline file lists the fingerprints of known warnings, one per line.
+A fingerprint hashes the check id, the file, the message and how many
+identical warnings come before it in the same file. The line number is
+left out, so that fingerprints survive code being moved around. Messages
+name the symbol or the #include they are about.
+
+"""
+
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import collections
+import hashlib
+import io
+import re
+
+
+_HEADER = '# cppclean baseline 1'
+
+# Line numbers that are part of messages, such as in "already #included
+# on line 12".
+_LINE_NUMBER = re.compile(r'\bline \d+')
+
+
+class Error(Exception):
+
+    """Raised when a baseline file cannot be read."""
+
+
+def fingerprint(filename, check, message, occurrence=0):
+    """Return the fingerprint of a warning.
+
+    occurrence counts the identical warnings that come before it in the
+    same file.
+
+    """
+    key = '\0'.join([filename.replace('\\', '/'),
+                     check,
+                     _LINE_NUMBER.sub('line', message),
+                     str(occurrence)])
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()[:16]
+
+
+def load(filename):
+    """Return the set of fingerprints in a baseline file."""
+    try:
+        with io.open(filename, encoding='utf-8') as input_file:
+            lines = input_file.read().splitlines()
+    except IOError as exception:
+        raise Error(exception)
+    if not lines or lines[0] != _HEADER:
+        raise Error('{}: not a cppclean baseline'.format(filename))
+    return frozenset([line.strip() for line in lines[1:] if line.strip()])
+
+
+def save(filename, fingerprints):
+    with io.open(filename, 'w', encoding='utf-8') as output_file:
+        output_file.write(_HEADER + '\n')
+        output_file.write(''.join([f + '\n' for f in sorted(fingerprints)]))
+
+
+class BaselineFilter(object):
+
+    """Pass on to reporter the warnings that are not in the baseline."""
+
+    def __init__(self, reporter, fingerprints=frozenset()):
+        self.reporter = reporter
+        self.baseline = fingerprints
+        # The fingerprints of all the warnings, to write a new baseline.
+        self.fingerprints = set()
+        self.suppressed = 0
+        self._occurrences = collections.Counter()
+
+    def add(self, filename, line, column, check, message):
+        key = (filename, check, _LINE_NUMBER.sub('line', message))
+        occurrence = self._occurrences[key]
+        self._occurrences[key] += 1
+
+        value = fingerprint(filename, check, message, occurrence)
+        self.fingerprints.add(value)
+        if value in self.baseline:
+            self.suppressed += 1
+        else:
+            self.reporter.add(filename, line, column, check, message)
+
+    def close(self):
+        self.reporter.close()
@@ -0,0 +1,122 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Estimate what each header costs to compile across the whole project.
+
+A header costs the lines of everything it #includes, directly or not,
+once for each translation unit that #includes it. The translation units
+are the source files checked.
+
+"""
+
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import collections
+
+from . import find_warnings
+
+
+# lines is the number of lines of the file and of all the files it
+# #includes, units the number of translation units that #include it and
+# cost their product.
+Cost = collections.namedtuple('Cost', ['lines', 'units', 'cost'])
+
+
+def get_costs(graph):
+    """Map each file of the include_graph.IncludeGraph graph to its Cost.
+
+    The files are the keys of the graph.
+
+    """
+    closures = graph.get_closures()
+    units = collections.Counter()
+    for key, node in graph.nodes.items():
+        if node.checked and not find_warnings.is_header_file(node.filename):
+            units.update(closures[key])
+
+    closure_lines = {}
+    costs = {}
+    for key in graph.nodes:
+        closure = closures[key]
+        lines = closure_lines.get(id(closure))
+        if lines is None:
+            lines = sum([graph.nodes[k].lines or 0 for k in closure])
+            closure_lines[id(closure)] = lines
+        costs[key] = Cost(lines, units[key], lines * units[key])
+    return costs
+
+
+def get_most_expensive(graph, costs, count):
+    """Return the count (filename, Cost) of headers that cost the most."""
+    header_costs = [(graph.nodes[key].filename, cost)
+                    for key, cost in costs.items()
+                    if find_warnings.is_header_file(graph.nodes[key].filename)]
+    return sorted(header_costs, key=lambda c: (-c[1].cost, c[0]))[:count]
+
+
+def print_summary(output_file, graph, costs, count=10):
+    output_file.write('{:>12} {:>10} {:>6}  {}\n'.format(
+        'cost', 'lines', 'units', 'header'))
+    for filename, cost in get_most_expensive(graph, costs, count):
+        output_file.write('{:>12} {:>10} {:>6}  {}\n'.format(
+            cost.cost, cost.lines, cost.units, filename))
+
+
+class CostRanker(object):
+
+    """Pass on warnings, ranking the unnecessary #includes by cost.
+
+    The unnecessary #includes are held until close(), when graph is
+    complete. They are then passed on last, the most expensive first,
+    with the lines that removing them would save compiling.
+
+    """
+
+    def __init__(self, reporter, graph):
+        self.reporter = reporter
+        self.graph = graph
+        self.costs = {}
+        self._includes = []
+
+    def add(self, filename, line, column, check, message):
+        if check == 'unnecessary-include':
+            self._includes.append((filename, line, column, check, message))
+        else:
+            self.reporter.add(filename, line, column, check, message)
+
+    def get_saved_lines(self, filename, line):
+        """Return the lines saved by removing the #include of line.
+
+        It is the lines of the header #included, for each translation
+        unit that #includes filename. Lines that are also #included in
+        another way are counted too, so this is an upper bound.
+
+        """
+        key = self.graph.get_key(filename)
+        for include_line, included, _ in self.graph.edges.get(key, ()):
+            if include_line == line:
+                return self.costs[included].lines * self.costs[key].units
+        return 0
+
+    def close(self):
+        self.costs = get_costs(self.graph)
+        ranked = []
+        for filename, line, column, check, message in self._includes:
+            saved = self.get_saved_lines(filename, line)
+            ranked.append((-saved, filename, line, column, check,
+                           '{}; removing it saves compiling about {} '
+                           'lines'.format(message, saved)))
+        self._includes = []
+        for _, filename, line, column, check, message in sorted(ranked):
+            self.reporter.add(filename, line, column, check, message)
+        self.reporter.close()
@@ -0,0 +1,96 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""A cache bounded by the number and the size of its values."""
+
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import collections
+
+from . import memory
+
+
+class LRUCache(object):
+
+    """Map keys to values, evicting the least recently used values.
+
+    max_entries bounds the number of values and max_bytes the sum of
+    their weights, where weigh(value) returns the weight of a value. None
+    is no bound. The value added last is never evicted, even if it weighs
+    more than max_bytes on its own.
+
+    Only get() counts hits and misses and makes a value recently used.
+
+    """
+
+    def __init__(self, max_entries=None, max_bytes=None,
+                 weigh=memory.get_size):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.weigh = weigh
+        # Map key: (value, weight), from the least recently used.
+        self._entries = collections.OrderedDict()
+        # Sum of the weights, which are only computed with max_bytes.
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def __getitem__(self, key):
+        return self._entries[key][0]
+
+    def __setitem__(self, key, value):
+        self._remove(key)
+        weight = 0
+        if self.max_bytes is not None:
+            weight = self.weigh(value)
+        self._entries[key] = (value, weight)
+        self.size += weight
+        self._evict()
+
+    def get(self, key, default=None):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            self.misses += 1
+            return default
+        self.hits += 1
+        self._entries[key] = entry
+        return entry[0]
+
+    def items(self):
+        return [(key, entry[0]) for key, entry in self._entries.items()]
+
+    def values(self):
+        return [entry[0] for entry in self._entries.values()]
+
+    def _remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.size -= entry[1]
+
+    def _is_full(self):
+        if self.max_entries is not None and len(self) > self.max_entries:
+            return True
+        return self.max_bytes is not None and self.size > self.max_bytes
+
+    def _evict(self):
+        while len(self) > 1 and self._is_full():
+            _, (_, weight) = self._entries.popitem(last=False)
+            self.size -= weight
+            self.evictions += 1
@@ -0,0 +1,154 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Store the results of runs in an SQLite database.
+
+Every run adds a row to the runs table. The warnings, the files and the
+resolved #include edges of the run refer to it by run_id, so that runs
+can be compared with each other. For example, the headers that cause
+the most unnecessary #include warnings in the latest run are:
+
+    SELECT message, COUNT(*) FROM warnings
+    WHERE run_id = (SELECT MAX(id) FROM runs)
+        AND check_id = 'unnecessary-include'
+    GROUP BY message ORDER BY COUNT(*) DESC;
+
+"""
+
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import sqlite3
+import time
+
+from . import __version__
+
+
+# Increment when the schema changes.
+SCHEMA_VERSION = 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    version TEXT,
+    arguments TEXT,
+    started REAL,
+    finished REAL
+);
+CREATE TABLE IF NOT EXISTS files (
+    run_id INTEGER REFERENCES runs (id),
+    filename TEXT,
+    seconds REAL,
+    warnings INTEGER,
+    error TEXT
+);
+CREATE TABLE IF NOT EXISTS warnings (
+    run_id INTEGER REFERENCES runs (id),
+    filename TEXT,
+    line_number INTEGER,
+    column_number INTEGER,
+    check_id TEXT,
+    message TEXT
+);
+CREATE TABLE IF NOT EXISTS includes (
+    run_id INTEGER REFERENCES runs (id),
+    filename TEXT,
+    line_number INTEGER,
+    included TEXT,
+    system INTEGER
+);
+CREATE INDEX IF NOT EXISTS files_by_name ON files (run_id, filename);
+CREATE INDEX IF NOT EXISTS warnings_by_file ON warnings (run_id, filename);
+CREATE INDEX IF NOT EXISTS warnings_by_check ON warnings (run_id, check_id);
+CREATE INDEX IF NOT EXISTS includes_by_file ON includes (run_id, filename);
+CREATE INDEX IF NOT EXISTS includes_by_included ON includes (run_id, included);
+"""
+
+_INSERTS = {
+    'files': 'INSERT INTO files VALUES (?, ?, ?, ?, ?)',
+    'warnings': 'INSERT INTO warnings VALUES (?, ?, ?, ?, ?, ?)',
+    'includes': 'INSERT INTO includes VALUES (?, ?, ?, ?, ?)',
+}
+
+
+class Error(Exception):
+
+    """Raised when the database cannot be used."""
+
+
+class Database(object):
+
+    """Write the results of a single run in batched transactions.
+
+    Database can be used as a report.Reporter, to store the warnings.
+
+    """
+
+    def __init__(self, filename, arguments='', batch_size=10000):
+        self.batch_size = batch_size
+        self.connection = sqlite3.connect(filename)
+        try:
+            self._create_schema()
+            with self.connection:
+                self.run_id = self.connection.execute(
+                    'INSERT INTO runs (version, arguments, started) '
+                    'VALUES (?, ?, ?)',
+                    (__version__, arguments, time.time())).lastrowid
+        except sqlite3.DatabaseError as exception:
+            self.connection.close()
+            raise Error('{}: {}'.format(filename, exception))
+        # Map table name: rows waiting to be inserted.
+        self._rows = dict((table, []) for table in _INSERTS)
+        self._row_count = 0
+
+    def _create_schema(self):
+        version = self.connection.execute('PRAGMA user_version').fetchone()[0]
+        if version == 0:
+            with self.connection:
+                self.connection.executescript(_SCHEMA)
+                self.connection.execute(
+                    'PRAGMA user_version = {}'.format(SCHEMA_VERSION))
+        elif version != SCHEMA_VERSION:
+            raise sqlite3.DatabaseError(
+                'unsupported schema version {}'.format(version))
+
+    def _add_row(self, table, row):
+        self._rows[table].append((self.run_id,) + row)
+        self._row_count += 1
+        if self._row_count >= self.batch_size:
+            self.flush()
+
+    def add(self, filename, line, column, check, message):
+        self._add_row('warnings', (filename, line, column, check, message))
+
+    def add_file(self, filename, seconds, warnings, error=None):
+        self._add_row('files', (filename, seconds, warnings, error))
+
+    def add_include(self, filename, line, included, system):
+        self._add_row('includes', (filename, line, included, int(system)))
+
+    def flush(self):
+        """Insert the buffered rows in a single transaction."""
+        with self.connection:
+            for table, rows in self._rows.items():
+                if rows:
+                    self.connection.executemany(_INSERTS[table], rows)
+                    del rows[:]
+        self._row_count = 0
+
+    def close(self):
+        self.flush()
+        with self.connection:
+            self.connection.execute(
+                'UPDATE runs SET finished = ? WHERE id = ?',
+                (time.time(), self.run_id))
+        self.connection.close()
@@ -27,16 +27,21 @@ from __future__ import absolute_import
 from __future__ import print_function
 from __future__ import unicode_literals
 
+import collections
 import os
 import sys
 
 from . import ast
+from . import cache
 from . import headers
 from . import keywords
+from . import limits
 from . import metrics
+from . import stats
 from . import symbols
 from . import tokenize
 from . import utils
+from . import visitor
 
 
 try:
@@ -58,15 +63,50 @@ USES_DECLARATION = 2
 
 DECLARATION_TYPES = (ast.Class, ast.Struct, ast.Enum, ast.Union)
 
+# Nodes whose symbol uses are determined once all #includes are read.
+_USE_TYPES = (ast.VariableDeclaration, ast.Function, ast.Typedef, ast.Friend,
+              ast.Class)
+
 
 class Module(object):
 
     """Data container representing a single source file."""
 
-    def __init__(self, filename, ast_list):
+    def __init__(self, filename, ast_list, public_symbols=None):
         self.filename = filename
         self.ast_list = ast_list
-        self.public_symbols = self._get_exported_symbols()
+        if public_symbols is None:
+            public_symbols = self._get_exported_symbols()
+        self.public_symbols = public_symbols
+        self._symbol_table = None
+        self._public_functions = None
+        # Offsets of the newlines of the file, to find the line numbers of
+        # its warnings without reading it again. None if not known.
+        self.newlines = None
+
+    @property
+    def public_functions(self):
+        """Return the public symbols that are functions."""
+        if self._public_functions is None:
+            self._public_functions = dict(
+                [(name, node) for name, node in self.public_symbols.items()
+                 if isinstance(node, ast.Function)])
+        return self._public_functions
+
+    @property
+    def symbol_table(self):
+        """Return the symbols.SymbolTable of the public symbols.
+
+        It is built once and shared as a layer by the symbol tables of all
+        the files that #include the module, so it must not be changed.
+
+        """
+        if self._symbol_table is None:
+            self._symbol_table = symbols.SymbolTable()
+            for name, node in self.public_symbols.items():
+                self._symbol_table.add_symbol(name, node.namespace, node,
+                                              self)
+        return self._symbol_table
 
     def _get_exported_symbols(self):
         if not self.ast_list:
@@ -86,122 +126,265 @@ def is_cpp_file(filename):
 
 class WarningHunter(object):
 
-    # Cache filename: ast_list
-    _module_cache = {}
+    # Cache filename: Module. It can be replaced by a bounded cache.LRUCache,
+    # or any mapping with get().
+    _module_cache = cache.LRUCache()
+    # Finds the #included files.
+    _resolver = headers.Resolver()
 
-    def __init__(self, filename, source, ast_list, include_paths, quiet=False):
+    def __init__(self, filename, source, ast_list, include_paths, quiet=False,
+                 file_limits=None, src_metrics=None):
+        # ast_list is None when the AST is only passed through a visitor.
         self.filename = filename
         self.source = source
         self.ast_list = ast_list
         self.include_paths = include_paths[:]
         self.quiet = quiet
+        # limits.Limits of the file, also applied to the #included files
+        # that are not cached yet.
+        self.file_limits = file_limits
         self.symbol_table = symbols.SymbolTable()
 
-        self.metrics = metrics.Metrics(source)
-        self.warnings = set()
-        if filename not in self._module_cache:
+        self.metrics = src_metrics or metrics.Metrics(source)
+        # Map (filename, line number, message): (check, column).
+        self.warnings = {}
+        if ast_list is not None and filename not in self._module_cache:
             self._module_cache[filename] = Module(filename, ast_list)
 
-    def _add_warning(self, msg, node, filename=None):
+        # Collected while walking the AST.
+        # Map header-filename: (#include AST node, module).
+        self._included_files = collections.OrderedDict()
+        # Map declaration-name: AST node.
+        self._forward_declarations = {}
+        self._files_seen = {}
+        # List of (offset, resolved filename, system) of #includes. The
+        # line numbers are only found if the edges are used.
+        self._include_offsets = []
+        # List of (AST node, namespaces of the enclosing using directives).
+        self._use_nodes = []
+        self._using_namespaces = ()
+        # List of (name, class names of a method, AST node location) of
+        # the exportable function definitions.
+        self._functions = []
+        # Map symbol name: first #included module that exports it. Built
+        # when first needed.
+        self._exporters = None
+
+    @property
+    def streaming(self):
+        # Headers are kept whole for the files that #include them. Only
+        # a few details of source files are needed.
+        return not is_header_file(self.filename)
+
+    def _add_warning(self, check, msg, node, filename=None):
         if filename is not None:
-            contents = utils.read_file(filename)
-            src_metrics = metrics.Metrics(contents)
+            src_metrics = self._get_metrics(filename)
         else:
             filename = self.filename
             src_metrics = self.metrics
         line_number = get_line_number(src_metrics, node)
-        self.warnings.add((filename, line_number, msg))
-
-    def show_warnings(self):
+        self.warnings.setdefault((filename, line_number, msg),
+                                 (check, src_metrics.get_column(node.start)))
+
+    def get_include_edges(self):
+        """Return the (line number, resolved filename, system) of the
+        #includes."""
+        line_numbers = self.metrics.get_line_numbers(
+            [offset for offset, _, _ in self._include_offsets])
+        return [(line_number, filename, system)
+                for line_number, (_, filename, system)
+                in zip(line_numbers, self._include_offsets)]
+
+    def _get_metrics(self, filename):
+        """Return the metrics.Metrics of the newlines of filename.
+
+        The newlines are kept with the cached module of filename, so the
+        file is read at most once while its module stays cached.
+
+        """
+        module = self._module_cache.get(filename)
+        if module is not None and module.newlines is not None:
+            return metrics.Metrics(None, module.newlines)
+        src_metrics = metrics.Metrics(utils.read_file(filename))
+        if module is not None:
+            module.newlines = src_metrics.get_newlines()
+        return src_metrics
+
+    def report_warnings(self, reporter):
         for filename, line_num, msg in sorted(self.warnings):
-            if line_num == 0:
-                print('{}: {}'.format(filename, msg))
-            else:
-                print('{}:{}: {}'.format(filename, line_num, msg))
+            check, column = self.warnings[(filename, line_num, msg)]
+            reporter.add(filename, line_num, column, check, msg)
+
+    def register(self, ast_visitor):
+        if self.ast_list is None and is_header_file(self.filename):
+            self.ast_list = []
+            ast_visitor.add_callback(ast.Node, self._visit_node)
+
+        if is_header_file(self.filename):
+            ast_visitor.add_callback(_USE_TYPES, self._visit_use)
+            ast_visitor.add_callback(ast.Using, self._visit_using)
+        elif is_cpp_file(self.filename):
+            ast_visitor.add_callback(ast.Function, self._visit_function)
+        else:
+            return
+        ast_visitor.add_callback(ast.Include, self._visit_include)
+        ast_visitor.add_callback(DECLARATION_TYPES, self._visit_declaration)
+
+    def finish(self, reporter):
+        if self.ast_list is not None:
+            if self.filename not in self._module_cache:
+                self._module_cache[self.filename] = Module(self.filename,
+                                                           self.ast_list)
+            module = self._module_cache[self.filename]
+            if module.newlines is None:
+                # The files checked later find the line numbers of their
+                # warnings in this file without reading it.
+                module.newlines = self.metrics.get_newlines()
+        self._find_collected_warnings()
+        self.report_warnings(reporter)
+        return len(self.warnings)
 
     def find_warnings(self):
+        ast_visitor = visitor.Visitor()
+        self.register(ast_visitor)
+        ast_visitor.walk(self.ast_list)
+        self._find_collected_warnings()
+
+    def _find_collected_warnings(self):
         if is_header_file(self.filename):
             self._find_header_warnings()
         elif is_cpp_file(self.filename):
             self._find_source_warnings()
 
     def _update_symbol_table(self, module):
-        for name, node in module.public_symbols.items():
-            self.symbol_table.add_symbol(name, node.namespace, node, module)
+        with stats.phase('symbol table'):
+            self.symbol_table.add_layer(module.symbol_table)
 
     def _get_module(self, node):
-        include_paths = [os.path.dirname(self.filename)] + self.include_paths
-        source, filename = headers.read_source(node.filename, include_paths)
+        with stats.phase('include resolution'):
+            return self._resolve_module(node)
 
-        if source is None:
-            module = Module(filename, None)
-            msg = "unable to find '{}'".format(filename)
-            self._add_warning(msg, node)
-        elif filename in self._module_cache:
+    def _resolve_module(self, node):
+        include_paths = [os.path.dirname(self.filename)] + self.include_paths
+        filename = self._resolver.find(node.filename, include_paths)
+        module = None
+        if filename is not None:
+            module = self._module_cache.get(filename)
+        if module is not None:
             # The cache survives across all instances, but the symbol table
             # is per instance, so we need to make sure the symbol table
             # is updated even if the module was in the cache.
-            module = self._module_cache[filename]
-            self._update_symbol_table(module)
-        else:
-            ast_list = None
-            try:
-                builder = ast.builder_from_source(source, filename,
-                                                  quiet=self.quiet)
-                ast_list = [_f for _f in builder.generate() if _f]
-            except tokenize.TokenError:
-                pass
-            except ast.ParseError as error:
-                if not self.quiet:
-                    print(
-                        "Exception while processing '{}': {}".format(
-                            filename,
-                            error),
-                        file=sys.stderr)
-            module = Module(filename, ast_list)
-            self._module_cache[filename] = module
+            stats.count('module cache hit')
             self._update_symbol_table(module)
+            return module
+
+        source = None
+        if filename is not None:
+            source = utils.read_file(filename, False)
+        if source is None:
+            module = Module(node.filename, None)
+            msg = "unable to find '{}'".format(node.filename)
+            self._add_warning('unable-to-find', msg, node)
+            return module
+        stats.count('module cache miss')
+
+        ast_list = None
+        time_limit_exceeded = None
+        try:
+            builder = ast.builder_from_source(source, filename,
+                                              quiet=self.quiet,
+                                              limits=self.file_limits)
+            ast_list = [_f for _f in builder.generate() if _f]
+        except (tokenize.TokenError, limits.TokenLimitExceeded):
+            # A header with too many tokens is left unparsed, like one
+            # that cannot be tokenized.
+            pass
+        except limits.TimeLimitExceeded as exception:
+            # Running out of time stops checking the file. The header is
+            # left unparsed too, so that the other files that #include it
+            # do not run out of time on it again.
+            time_limit_exceeded = limits.TimeLimitExceeded(
+                "{} parsing '{}'".format(exception, filename))
+        except ast.ParseError as error:
+            if not self.quiet:
+                print(
+                    "Exception while processing '{}': {}".format(
+                        filename,
+                        error),
+                    file=sys.stderr)
+        module = Module(filename, ast_list)
+        # The newlines are kept with the module, so that the warnings
+        # found in the file later need not read it again, and so that the
+        # module cache bounds them too.
+        module.newlines = metrics.Metrics(source).get_newlines()
+        self._module_cache[filename] = module
+        if time_limit_exceeded is not None:
+            raise time_limit_exceeded
+        self._update_symbol_table(module)
         return module
 
-    def _read_and_parse_includes(self):
-        # Map header-filename: (#include AST node, module).
-        included_files = {}
-        # Map declaration-name: AST node.
-        forward_declarations = {}
-        files_seen = {}
-        for node in self.ast_list:
-            if isinstance(node, ast.Include):
-                if node.system:
-                    filename = node.filename
-                else:
-                    module = self._get_module(node)
-                    filename = module.filename
-                    _, ext = os.path.splitext(filename)
-                    if ext.lower() != '.hxx':
-                        included_files[filename] = node, module
-                if is_cpp_file(filename):
-                    self._add_warning(
-                        "should not #include C++ source file '{}'".format(
-                            node.filename),
-                        node)
-                if filename == self.filename:
-                    self._add_warning(
-                        "'{}' #includes itself".format(node.filename),
-                        node)
-                if filename in files_seen:
-                    include_node = files_seen[filename]
-                    line_num = get_line_number(self.metrics, include_node)
-                    self._add_warning(
-                        "'{}' already #included on line {}".format(
-                            node.filename,
-                            line_num),
-                        node)
-                else:
-                    files_seen[filename] = node
-            if isinstance(node, DECLARATION_TYPES) and node.is_declaration():
-                forward_declarations[node.full_name()] = node
+    def _visit_node(self, node, parents):
+        if not parents:
+            self.ast_list.append(node)
 
-        return included_files, forward_declarations
+    def _visit_include(self, node, parents):
+        if parents:
+            return
+        if node.system:
+            filename = node.filename
+        else:
+            module = self._get_module(node)
+            filename = module.filename
+            _, ext = os.path.splitext(filename)
+            if ext.lower() != '.hxx':
+                self._included_files[filename] = node, module
+        self._include_offsets.append((node.start, filename, node.system))
+        if is_cpp_file(filename):
+            self._add_warning(
+                'include-source-file',
+                "should not #include C++ source file '{}'".format(
+                    node.filename),
+                node)
+        if filename == self.filename:
+            self._add_warning(
+                'include-self',
+                "'{}' #includes itself".format(node.filename),
+                node)
+        if filename in self._files_seen:
+            include_node = self._files_seen[filename]
+            line_num = get_line_number(self.metrics, include_node)
+            self._add_warning(
+                'duplicate-include',
+                "'{}' already #included on line {}".format(
+                    node.filename,
+                    line_num),
+                node)
+        else:
+            self._files_seen[filename] = node
+
+    def _visit_declaration(self, node, parents):
+        if not parents and node.is_declaration():
+            self._forward_declarations[node.full_name()] = node
+
+    def _visit_use(self, node, parents):
+        if isinstance(node, ast.Union) or (isinstance(node, ast.Class) and
+                                           node.body is None):
+            return
+        self._use_nodes.append((node, self._using_namespaces))
+
+    def _visit_function(self, node, parents):
+        if parents or not (node.is_definition() and node.is_exportable()):
+            return
+        # Do not keep the node, its body can be large.
+        class_names = None
+        if isinstance(node, ast.Method):
+            class_names = [n.name for n in node.in_class]
+        self._functions.append(
+            (node.name, class_names, ast.Node(node.start, node.end)))
+
+    def _visit_using(self, node, parents):
+        if node.names[0].name == 'namespace':
+            self._using_namespaces += (node.names[1].name,)
 
     def _verify_include_files_used(self, file_uses, included_files):
         """Find all #include files that are unnecessary."""
@@ -213,7 +396,7 @@ class WarningHunter(object):
                         node.filename)
                     if use & USES_REFERENCE:
                         msg += '; use a forward declaration instead'
-                    self._add_warning(msg, node)
+                    self._add_warning('unnecessary-include', msg, node)
 
     def _verify_forward_declarations_used(self, forward_declarations,
                                           decl_uses, file_uses):
@@ -224,12 +407,13 @@ class WarningHunter(object):
                     node = forward_declarations[cls]
                     msg = ("'{}' forward declared, "
                            'but needs to be #included'.format(cls))
-                    self._add_warning(msg, node)
+                    self._add_warning('forward-declaration-needs-include',
+                                      msg, node)
             else:
                 if decl_uses[cls] == UNUSED:
                     node = forward_declarations[cls]
                     msg = "'{}' not used".format(cls)
-                    self._add_warning(msg, node)
+                    self._add_warning('unused-forward-declaration', msg, node)
 
     def _determine_uses(self, included_files, forward_declarations):
         """Set up the use type of each symbol."""
@@ -238,14 +422,45 @@ class WarningHunter(object):
         symbol_table = self.symbol_table
 
         for name, node in forward_declarations.items():
-            try:
-                symbol_table.lookup_symbol(node.name, node.namespace)
+            if symbol_table.find_symbol(node.name, node.namespace):
                 decl_uses[name] |= USES_REFERENCE
-            except symbols.Error:
+            else:
                 module = Module(name, None)
                 self.symbol_table.add_symbol(node.name, node.namespace, node,
                                              module)
 
+        # The symbol table does not change from here on, so remember every
+        # lookup. Map (name, namespace): (node, module) or None.
+        lookups = {}
+        # Map namespace: its known namespaces.
+        known_namespaces = {}
+
+        def _lookup(name, namespace):
+            # The names deeper than the longest namespace are left out, so
+            # that the names a function body pushes do not make the key
+            # longer.
+            namespace = tuple(namespace[:symbol_table.namespace_depth])
+            key = (name, namespace)
+            try:
+                return lookups[key]
+            except KeyError:
+                pass
+            # Only the known namespaces change the result, and function
+            # bodies can add thousands of other names.
+            try:
+                known = known_namespaces[namespace]
+            except KeyError:
+                known = tuple(symbol_table.get_namespace(namespace))
+                known_namespaces[namespace] = known
+            known_key = (name, known)
+            try:
+                result = lookups[known_key]
+            except KeyError:
+                result = symbol_table.find_symbol(name, known)
+                lookups[known_key] = result
+            lookups[key] = result
+            return result
+
         def _add_declaration(name, namespace):
             if not name:
                 # Ignore anonymous struct. It is not standard, but we might as
@@ -259,9 +474,8 @@ class WarningHunter(object):
                 decl_uses[name] |= USES_DECLARATION
 
         def _add_reference(name, namespace):
-            try:
-                file_use_node = symbol_table.lookup_symbol(name, namespace)
-            except symbols.Error:
+            file_use_node = _lookup(name, namespace)
+            if file_use_node is None:
                 return
 
             name = file_use_node[1].filename
@@ -282,9 +496,8 @@ class WarningHunter(object):
                 # Happens when variables are defined with inlined types, e.g.:
                 #   enum {...} variable;
                 return
-            try:
-                file_use_node = symbol_table.lookup_symbol(name, namespace)
-            except symbols.Error:
+            file_use_node = _lookup(name, namespace)
+            if file_use_node is None:
                 return
 
             name = file_use_node[1].filename
@@ -375,38 +588,25 @@ class WarningHunter(object):
                     _add_variable(node, namespace)
 
         # Iterate through the source AST/tokens, marking each symbols use.
-        ast_seq = [self.ast_list]
-        namespace_stack = []
-        while ast_seq:
-            for node in ast_seq.pop():
-                if isinstance(node, ast.VariableDeclaration):
-                    namespace = namespace_stack + node.namespace
-                    _add_variable(node.type, namespace)
-                elif isinstance(node, ast.Function):
-                    namespace = namespace_stack + node.namespace
-                    _process_function(node, namespace)
-                    if node.body:
-                        _process_function_body(node, namespace)
-                elif isinstance(node, ast.Typedef):
-                    namespace = namespace_stack + node.namespace
-                    _process_types(node.alias, namespace)
-                elif isinstance(node, ast.Friend):
-                    expr = node.expr
-                    namespace = namespace_stack + node.namespace
-                    if isinstance(expr, ast.Type):
-                        _add_reference(expr.name, namespace)
-                    elif isinstance(expr, ast.Function):
-                        _process_function(expr, namespace)
-                elif isinstance(node, ast.Union) and node.body is not None:
-                    ast_seq.append(node.body)
-                elif isinstance(node, ast.Class) and node.body is not None:
-                    _add_declaration(node.name, node.namespace)
-                    namespace = namespace_stack + node.namespace
-                    _add_template_use('', node.bases, namespace)
-                    ast_seq.append(node.body)
-                elif isinstance(node, ast.Using):
-                    if node.names[0].name == 'namespace':
-                        namespace_stack.append(node.names[1].name)
+        for node, using_namespaces in self._use_nodes:
+            namespace = list(using_namespaces) + node.namespace
+            if isinstance(node, ast.VariableDeclaration):
+                _add_variable(node.type, namespace)
+            elif isinstance(node, ast.Function):
+                _process_function(node, namespace)
+                if node.body:
+                    _process_function_body(node, namespace)
+            elif isinstance(node, ast.Typedef):
+                _process_types(node.alias, namespace)
+            elif isinstance(node, ast.Friend):
+                expr = node.expr
+                if isinstance(expr, ast.Type):
+                    _add_reference(expr.name, namespace)
+                elif isinstance(expr, ast.Function):
+                    _process_function(expr, namespace)
+            elif isinstance(node, ast.Class):
+                _add_declaration(node.name, node.namespace)
+                _add_template_use('', node.bases, namespace)
 
         return file_uses, decl_uses
 
@@ -420,10 +620,9 @@ class WarningHunter(object):
         self._verify_forward_declarations_used(forward_declarations, decl_uses,
                                                file_uses)
         for node in forward_declarations.values():
-            try:
-                file_use_node = self.symbol_table.lookup_symbol(node.name,
-                                                                node.namespace)
-            except symbols.Error:
+            file_use_node = self.symbol_table.find_symbol(node.name,
+                                                          node.namespace)
+            if file_use_node is None:
                 continue
             name = file_use_node[1].filename
             if (
@@ -433,43 +632,48 @@ class WarningHunter(object):
             ):
                 msg = ("'{}' forward declared, "
                        "but already #included in '{}'".format(node.name, name))
-                self._add_warning(msg, node)
+                self._add_warning('forward-declaration-already-included',
+                                  msg, node)
 
     def _find_incorrect_case(self, included_files):
         for (filename, node_and_module) in included_files.items():
             base_name = os.path.basename(filename)
-            try:
-                candidates = os.listdir(os.path.dirname(filename))
-            except OSError:
-                continue
-
-            correct_filename = get_correct_include_filename(base_name,
-                                                            candidates)
+            correct_filename = self._resolver.get_correct_case(filename)
             if correct_filename:
                 self._add_warning(
+                    'incorrect-include-case',
                     "'{}' should be '{}'".format(base_name, correct_filename),
                     node_and_module[0])
 
     def _find_header_warnings(self):
-        included_files, forward_declarations = self._read_and_parse_includes()
+        included_files = self._included_files
+        forward_declarations = self._forward_declarations
         self._find_unused_warnings(included_files, forward_declarations)
         self._find_incorrect_case(included_files)
 
+    def _get_exporters(self, all_headers):
+        if self._exporters is None:
+            self._exporters = {}
+            for _, header in all_headers.values():
+                for name in header.public_symbols:
+                    self._exporters.setdefault(name, header)
+        return self._exporters
+
     def _find_public_function_warnings(self, node, name, primary_header,
                                        all_headers):
         # Not found in the primary header, search all other headers.
-        for _, header in all_headers.values():
-            if name in header.public_symbols:
-                # If the primary.filename == header.filename, it probably
-                # indicates an error elsewhere. It sucks to mask it,
-                # but false positives are worse.
-                if primary_header:
-                    msg = ("expected to find '{}' in '{}', "
-                           "but found in '{}'".format(name,
-                                                      primary_header.filename,
-                                                      header.filename))
-                    self._add_warning(msg, node)
-                break
+        header = self._get_exporters(all_headers).get(name)
+        if header is not None:
+            # If the primary.filename == header.filename, it probably
+            # indicates an error elsewhere. It sucks to mask it,
+            # but false positives are worse.
+            if primary_header:
+                msg = ("expected to find '{}' in '{}', "
+                       "but found in '{}'".format(name,
+                                                  primary_header.filename,
+                                                  header.filename))
+                self._add_warning('function-in-unexpected-header',
+                                  msg, node)
         else:
             where = 'in any directly #included header'
             if primary_header:
@@ -479,35 +683,27 @@ class WarningHunter(object):
                         primary_header.filename))
 
             if name != 'main' and name != name.upper():
-                self._add_warning("'{}' not found {}".format(name, where),
+                self._add_warning('undeclared-function',
+                                  "'{}' not found {}".format(name, where),
                                   node)
 
     def _check_public_functions(self, primary_header, all_headers):
         """Verify all the public functions are also declared in a header
         file."""
         public_symbols = {}
-        declared_only_symbols = {}
         if primary_header:
-            for name, symbol in primary_header.public_symbols.items():
-                if isinstance(symbol, ast.Function):
-                    public_symbols[name] = symbol
-            declared_only_symbols = dict.fromkeys(public_symbols, True)
-
-        for node in self.ast_list:
-            # Make sure we have a function that should be exported.
-            if not isinstance(node, ast.Function):
-                continue
-            if isinstance(node, ast.Method):
-                # Ensure that for Foo::Bar, Foo is *not* a namespace.
-                # If Foo is a namespace, we have a function and not a method.
-                names = [n.name for n in node.in_class]
-                if names != self.symbol_table.get_namespace(names):
-                    continue
-            if not (node.is_definition() and node.is_exportable()):
+            public_symbols = primary_header.public_functions
+        declared_only_symbols = dict.fromkeys(public_symbols, True)
+
+        for name, class_names, node in self._functions:
+            # Ensure that for Foo::Bar, Foo is *not* a namespace.
+            # If Foo is a namespace, we have a function and not a method.
+            if (class_names is not None and
+                    class_names != self.symbol_table.get_namespace(
+                        class_names)):
                 continue
 
             # This function should be declared in a header file.
-            name = node.name
             if name in public_symbols:
                 declared_only_symbols[name] = False
             else:
@@ -521,22 +717,25 @@ class WarningHunter(object):
                 node = public_symbols[name]
                 if node.templated_types is None:
                     msg = "'{}' declared but not defined".format(name)
-                    self._add_warning(msg, node, primary_header.filename)
+                    self._add_warning('declared-not-defined', msg, node,
+                                      primary_header.filename)
 
     def _get_primary_header(self, included_files):
         basename = os.path.basename(os.path.splitext(self.filename)[0])
         include_paths = [os.path.dirname(self.filename)] + self.include_paths
-        source, filename = headers.read_source(basename + '.h', include_paths)
-        primary_header = included_files.get(filename)
+        filename = self._resolver.find(basename + '.h', include_paths)
+        primary_header = included_files.get(filename or basename + '.h')
         if primary_header:
             return primary_header[1]
-        if source is not None:
+        if filename is not None:
             msg = "should #include header file '{}'".format(filename)
-            self.warnings.add((self.filename, 0, msg))
+            self.warnings.setdefault((self.filename, 0, msg),
+                                     ('missing-primary-include', 0))
         return None
 
     def _find_source_warnings(self):
-        included_files, forward_declarations = self._read_and_parse_includes()
+        included_files = self._included_files
+        forward_declarations = self._forward_declarations
         self._find_incorrect_case(included_files)
 
         for node in forward_declarations.values():
@@ -547,7 +746,7 @@ class WarningHunter(object):
             msg = (
                 "'{}' forward declaration not expected in source file".format(
                     node.name))
-            self._add_warning(msg, node)
+            self._add_warning('forward-declaration-in-source', msg, node)
 
         # A primary header is optional. However, when looking up
         # defined methods in the source, always look in the
@@ -566,7 +765,8 @@ class WarningHunter(object):
                 if node.filename in includes:
                     msg = "'{}' already #included in '{}'".format(
                         node.filename, primary_header.filename)
-                    self._add_warning(msg, node)
+                    self._add_warning('already-included-in-primary-header',
+                                      msg, node)
 
         # TODO(nnorwitz): other warnings to add:
         #   * unused forward decls for variables (globals)/classes
@@ -579,18 +779,8 @@ def get_line_number(metrics_instance, node):
     return metrics_instance.get_line_number(node.start)
 
 
-def get_correct_include_filename(filename, candidate_filenames):
-    if filename not in candidate_filenames:
-        for candidate in candidate_filenames:
-            if filename.lower() == candidate.lower():
-                return candidate
-    return None
-
-
 def run(filename, source, entire_ast, include_paths, quiet):
     hunter = WarningHunter(filename, source, entire_ast,
                            include_paths=include_paths,
                            quiet=quiet)
-    hunter.find_warnings()
-    hunter.show_warnings()
-    return len(hunter.warnings)
+    return visitor.run([hunter], entire_ast)
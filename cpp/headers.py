@@ -21,16 +21,87 @@ from __future__ import unicode_literals
 
 import os
 
-from . import utils
-
 
 __author__ = 'nnorwitz@google.com (Neal Norwitz)'
 
 
-def read_source(filename, include_paths):
-    for path in include_paths:
-        actual_filename = os.path.join(path, filename)
-        source = utils.read_file(actual_filename, False)
-        if source is not None:
-            return source, actual_filename
-    return None, filename
+class Resolver(object):
+
+    """Find #included files, listing each directory only once.
+
+    A directory is listed again when its modification time changes. Each
+    file is only found once per run though, so files added or removed
+    while running are not found.
+
+    """
+
+    def __init__(self):
+        # Map directory: (modification time, names,
+        #                 {case-folded name: name}).
+        self._listings = {}
+        # Map (include paths, filename): path of the file or None.
+        self._found = {}
+
+    def find(self, filename, include_paths):
+        """Return the path of filename in the first include path with it.
+
+        Return None if no include path has filename.
+
+        """
+        key = (tuple(include_paths), filename)
+        try:
+            return self._found[key]
+        except KeyError:
+            pass
+
+        path = None
+        for include_path in include_paths:
+            actual_filename = os.path.join(include_path, filename)
+            if self._exists(actual_filename):
+                path = actual_filename
+                break
+        self._found[key] = path
+        return path
+
+    def get_correct_case(self, filename):
+        """Return the name of filename in its directory.
+
+        Return None if filename has the same case as in its directory,
+        or if it is not there at all.
+
+        """
+        directory, name = os.path.split(filename)
+        names, folded_names = self._list(directory)
+        if name in names:
+            return None
+        return folded_names.get(name.lower())
+
+    def _exists(self, filename):
+        directory, name = os.path.split(filename)
+        names, folded_names = self._list(directory)
+        if name in names:
+            return os.path.isfile(filename)
+        # Case-insensitive file systems find names of any case.
+        return name.lower() in folded_names and os.path.isfile(filename)
+
+    def _list(self, directory):
+        """Return the names and the case-folded names in directory."""
+        directory = directory or os.curdir
+        try:
+            mtime = os.stat(directory).st_mtime
+        except OSError:
+            mtime = None
+        listing = self._listings.get(directory)
+        if listing is None or listing[0] != mtime:
+            names = []
+            if mtime is not None:
+                try:
+                    names = os.listdir(directory)
+                except OSError:
+                    pass
+            folded_names = {}
+            for name in names:
+                folded_names.setdefault(name.lower(), name)
+            listing = (mtime, frozenset(names), folded_names)
+            self._listings[directory] = listing
+        return listing[1:]
@@ -0,0 +1,368 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Build the graph of the resolved #includes of the files checked.
+
+The #includes of the files checked are passed on as they are resolved.
+complete() then adds the #includes of the headers that were not checked,
+found by scanning their preprocessor directives only, so that the graph
+covers everything the files checked include, directly or not.
+
+A file can be #included through different paths, like inc/a.h and
+src/../inc/a.h, so the files are keyed by their canonical path. They
+are written with the path they were first added with.
+
+"""
+
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import collections
+import json
+import os
+import re
+
+from . import ast
+from . import metrics
+from . import tokenize
+from . import utils
+
+
+FORMATS = ('json', 'dot')
+
+# A preprocessor directive, with its continuation lines.
+_DIRECTIVE = re.compile(r'^[ \t]*#(?:.*\\\r?\n)*.*', re.MULTILINE)
+_NOT_NEWLINE = re.compile(r'[^\n]')
+
+
+def get_format(filename):
+    """Return the format of the graph file filename, by its extension."""
+    if os.path.splitext(filename)[1].lower() == '.dot':
+        return 'dot'
+    return 'json'
+
+
+def get_canonical_path(filename):
+    """Return the path that identifies filename, however it is spelled."""
+    return os.path.normcase(os.path.realpath(filename))
+
+
+def scan_includes(source, filename):
+    """Return the top level ast.Include nodes of source.
+
+    Only the preprocessor directives are parsed. If source cannot be
+    tokenized, only the lines of its directives are.
+
+    """
+    try:
+        tokens = list(tokenize.get_tokens(source))
+    except tokenize.TokenError:
+        tokens = tokenize.get_tokens(_get_directive_lines(source))
+    directives = [token for token in tokens
+                  if token.token_type == tokenize.PREPROCESSOR]
+    builder = ast.ASTBuilder(iter(directives), filename, quiet=True)
+    return [node for node in builder.generate()
+            if isinstance(node, ast.Include)]
+
+
+def _get_directive_lines(source):
+    """Return source with blanks instead of what is not a directive.
+
+    The offsets of the directives stay the same.
+
+    """
+    parts = []
+    end = 0
+    for match in _DIRECTIVE.finditer(source):
+        parts.append(_NOT_NEWLINE.sub(' ', source[end:match.start()]))
+        parts.append(match.group())
+        end = match.end()
+    parts.append(_NOT_NEWLINE.sub(' ', source[end:]))
+    return ''.join(parts)
+
+
+class Node(object):
+
+    """Data container for a file of the graph."""
+
+    def __init__(self, filename, system=False):
+        self.filename = filename
+        self.system = system
+        # The size of the file itself, None until it is read.
+        self.lines = None
+        self.bytes = None
+        self.checked = False
+
+    @property
+    def found(self):
+        return self.lines is not None
+
+
+class IncludeGraph(object):
+
+    """Files and the files they #include."""
+
+    def __init__(self):
+        # Map key: Node. The keys are returned by get_key().
+        self.nodes = collections.OrderedDict()
+        # Map key: list of (line number, included key, system). Files not
+        # in it have not been scanned yet.
+        self.edges = {}
+        # Map (filename, system): key.
+        self._keys = {}
+
+    def get_key(self, filename, system=False):
+        """Return the key of filename in nodes and edges.
+
+        It is the canonical path of filename, or the name of a system
+        header as it is #included.
+
+        """
+        try:
+            return self._keys[(filename, system)]
+        except KeyError:
+            pass
+        key = filename if system else get_canonical_path(filename)
+        self._keys[(filename, system)] = key
+        return key
+
+    def _get_node(self, filename, system=False):
+        key = self.get_key(filename, system)
+        if key not in self.nodes:
+            self.nodes[key] = Node(filename, system)
+        return key
+
+    def add_file(self, filename, source, checked=False):
+        """Add filename, whose #includes are added with add_include()."""
+        key = self._get_node(filename)
+        node = self.nodes[key]
+        node.lines = source.count('\n')
+        node.bytes = len(source)
+        node.checked = checked
+        self.edges.setdefault(key, [])
+
+    def add_include(self, filename, line, included, system):
+        key = self._get_node(filename)
+        included_key = self._get_node(included, system)
+        self.edges.setdefault(key, []).append((line, included_key, system))
+
+    def complete(self, include_paths, resolver):
+        """Scan the files #included by the graph that are not scanned yet.
+
+        The #includes are resolved like find_warnings.WarningHunter does,
+        with the headers.Resolver resolver.
+
+        """
+        pending = [node.filename for key, node in self.nodes.items()
+                   if key not in self.edges and not node.system]
+        while pending:
+            filename = pending.pop()
+            if self.get_key(filename) in self.edges:
+                continue
+            source = utils.read_file(filename, False)
+            if source is None:
+                self.edges[self.get_key(filename)] = []
+                continue
+            for included in self.add_scanned_file(filename, source,
+                                                  include_paths, resolver):
+                if self.get_key(included) not in self.edges:
+                    pending.append(included)
+
+    def add_scanned_file(self, filename, source, include_paths, resolver,
+                         checked=False):
+        """Add filename with the #includes of its preprocessor directives.
+
+        The #includes are resolved like find_warnings.WarningHunter does,
+        with the headers.Resolver resolver. Return the files #included
+        that are not system headers.
+
+        """
+        self.add_file(filename, source, checked)
+        paths = [os.path.dirname(filename)] + include_paths
+        src_metrics = metrics.Metrics(source)
+        try:
+            includes = scan_includes(source, filename)
+        except (tokenize.TokenError, ast.ParseError):
+            includes = []
+        included_files = []
+        for include in includes:
+            included = include.filename
+            if not include.system:
+                included = resolver.find(included, paths) or included
+                included_files.append(included)
+            self.add_include(filename,
+                             src_metrics.get_line_number(include.start),
+                             included, include.system)
+        return included_files
+
+    def get_components(self):
+        """Return the strongly connected components of the graph.
+
+        A component is a list of keys. Files that #include each other are
+        in the same component. A component is returned after the
+        components it #includes.
+
+        """
+        # Tarjan's algorithm, without recursion to handle deep graphs.
+        index = {}
+        low = {}
+        stack = []
+        on_stack = set()
+        components = []
+        for root in self.nodes:
+            if root in index:
+                continue
+            work = [(root, iter(self._get_targets(root)))]
+            index[root] = low[root] = len(index)
+            stack.append(root)
+            on_stack.add(root)
+            while work:
+                filename, targets = work[-1]
+                for target in targets:
+                    if target not in index:
+                        index[target] = low[target] = len(index)
+                        stack.append(target)
+                        on_stack.add(target)
+                        work.append((target,
+                                     iter(self._get_targets(target))))
+                        break
+                    if target in on_stack:
+                        low[filename] = min(low[filename], index[target])
+                else:
+                    work.pop()
+                    if work:
+                        parent = work[-1][0]
+                        low[parent] = min(low[parent], low[filename])
+                    if low[filename] == index[filename]:
+                        component = []
+                        while True:
+                            member = stack.pop()
+                            on_stack.discard(member)
+                            component.append(member)
+                            if member == filename:
+                                break
+                        components.append(component)
+        return components
+
+    def find_cycles(self):
+        """Return the sorted lists of files that #include each other."""
+        return [sorted([self.nodes[key].filename for key in cycle])
+                for cycle in self._get_cycles()]
+
+    def _get_cycles(self):
+        return [component for component in self.get_components()
+                if len(component) > 1 or
+                component[0] in self._get_targets(component[0])]
+
+    def get_closures(self):
+        """Map each file to the set of files it #includes, directly or not.
+
+        The files are keys. The set of a file includes the file itself.
+        Files that #include each other share the same set.
+
+        """
+        closures = {}
+        for component in self.get_components():
+            closure = set(component)
+            for filename in component:
+                for target in self._get_targets(filename):
+                    if target not in closure:
+                        closure.update(closures[target])
+            closure = frozenset(closure)
+            for filename in component:
+                closures[filename] = closure
+        return closures
+
+    def _get_targets(self, key):
+        return [edge[1] for edge in self.edges.get(key, ())]
+
+    def get_reachable(self, filenames):
+        """Return the files that filenames #include, directly or not.
+
+        The files are returned as keys, and filenames are returned too.
+
+        """
+        reachable = set()
+        pending = [self.get_key(filename) for filename in filenames]
+        while pending:
+            key = pending.pop()
+            if key not in reachable:
+                reachable.add(key)
+                pending.extend(self._get_targets(key))
+        return reachable
+
+    def to_dict(self):
+        """Return the graph as a dict that can be dumped as JSON."""
+        nodes = []
+        for node in self.nodes.values():
+            nodes.append({'id': node.filename,
+                          'lines': node.lines,
+                          'bytes': node.bytes,
+                          'system': node.system,
+                          'found': node.found,
+                          'checked': node.checked})
+        edges = []
+        for key, node in self.nodes.items():
+            for line, included, system in self.edges.get(key, ()):
+                edges.append({'source': node.filename,
+                              'target': self.nodes[included].filename,
+                              'line': line,
+                              'system': system})
+        return {'nodes': nodes, 'edges': edges, 'cycles': self.find_cycles()}
+
+    def write(self, output_file, output_format='json'):
+        if output_format not in FORMATS:
+            raise ValueError('unknown format {}'.format(output_format))
+        if output_format == 'json':
+            output_file.write(json.dumps(self.to_dict(), indent=2,
+                                         sort_keys=True) + '\n')
+        else:
+            output_file.write(self.to_dot())
+
+    def to_dot(self):
+        """Return the graph in the Graphviz DOT language.
+
+        The edges of cycles are red.
+
+        """
+        in_cycle = {}
+        for number, cycle in enumerate(self._get_cycles()):
+            for key in cycle:
+                in_cycle[key] = number
+
+        lines = ['digraph includes {']
+        for node in self.nodes.values():
+            attributes = []
+            if node.found:
+                attributes.append('lines={}'.format(node.lines))
+                attributes.append('bytes={}'.format(node.bytes))
+            if node.system:
+                attributes.append('shape=box')
+            elif not node.found:
+                attributes.append('style=dashed')
+            lines.append('  {} [{}];'.format(_quote(node.filename),
+                                             ', '.join(attributes)))
+        for key, node in self.nodes.items():
+            for _, included, _ in self.edges.get(key, ()):
+                attributes = ''
+                cycle = in_cycle.get(key)
+                if cycle is not None and in_cycle.get(included) == cycle:
+                    attributes = ' [color=red]'
+                lines.append('  {} -> {}{};'.format(
+                    _quote(node.filename),
+                    _quote(self.nodes[included].filename), attributes))
+        lines.append('}')
+        return '\n'.join(lines) + '\n'
+
+
+def _quote(name):
+    return '"{}"'.format(name.replace('\\', '\\\\').replace('"', '\\"'))
@@ -0,0 +1,161 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Index the translation units that #include each file, across runs.
+
+The index is an SQLite database of the #includes of every file scanned
+and of the translation units that #include each file, directly or not.
+Each run only replaces the #includes of the files it scanned, and only
+the translation units that #include a file whose #includes changed are
+indexed again. Looking up a file is then a single indexed query.
+
+Files are stored by their canonical absolute path, as keyed in
+include_graph.IncludeGraph, so that the runs and the queries find a file
+however it is spelled and wherever they are run from.
+
+"""
+
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import sqlite3
+
+from . import find_warnings
+from . import include_graph
+
+
+# Increment when the schema changes.
+SCHEMA_VERSION = 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    filename TEXT PRIMARY KEY,
+    unit INTEGER
+);
+CREATE TABLE IF NOT EXISTS includes (
+    filename TEXT,
+    included TEXT
+);
+CREATE TABLE IF NOT EXISTS dependents (
+    filename TEXT,
+    unit TEXT,
+    PRIMARY KEY (filename, unit)
+);
+CREATE INDEX IF NOT EXISTS includes_by_file ON includes (filename);
+CREATE INDEX IF NOT EXISTS dependents_by_unit ON dependents (unit);
+"""
+
+
+class Error(Exception):
+
+    """Raised when the index cannot be used."""
+
+
+class IncludeIndex(object):
+
+    """Map each file to the translation units that #include it."""
+
+    def __init__(self, filename):
+        self.connection = sqlite3.connect(filename)
+        try:
+            self._create_schema()
+        except sqlite3.DatabaseError as exception:
+            self.connection.close()
+            raise Error('{}: {}'.format(filename, exception))
+
+    def _create_schema(self):
+        version = self.connection.execute('PRAGMA user_version').fetchone()[0]
+        if version == 0:
+            with self.connection:
+                self.connection.executescript(_SCHEMA)
+                self.connection.execute(
+                    'PRAGMA user_version = {}'.format(SCHEMA_VERSION))
+        elif version != SCHEMA_VERSION:
+            raise sqlite3.DatabaseError(
+                'unsupported schema version {}'.format(version))
+
+    def who_includes(self, filename):
+        """Return the sorted translation units that #include filename.
+
+        They are canonical paths. A translation unit is returned for
+        itself too.
+
+        """
+        return [row[0] for row in self.connection.execute(
+            'SELECT unit FROM dependents WHERE filename = ? ORDER BY unit',
+            (include_graph.get_canonical_path(filename),))]
+
+    def _load(self):
+        """Return the map filename: (unit, set of #included filenames)."""
+        files = dict((filename, (bool(unit), set()))
+                     for filename, unit in self.connection.execute(
+                         'SELECT filename, unit FROM files'))
+        for filename, included in self.connection.execute(
+                'SELECT filename, included FROM includes'):
+            files[filename][1].add(included)
+        return files
+
+    def update(self, graph):
+        """Add the files scanned in the include_graph.IncludeGraph graph.
+
+        Return the number of translation units indexed again.
+
+        """
+        files = self._load()
+        changed = {}
+        for filename, edges in graph.edges.items():
+            node = graph.nodes[filename]
+            unit = (node.checked and
+                    not find_warnings.is_header_file(node.filename))
+            entry = (unit, set([edge[1] for edge in edges]))
+            if files.get(filename) != entry:
+                changed[filename] = entry
+        if not changed:
+            return 0
+
+        units = set()
+        for filename, (unit, _) in changed.items():
+            units.update(self.who_includes(filename))
+            if unit:
+                units.add(filename)
+        files.update(changed)
+
+        # The #includes of all the files indexed, with the changes.
+        all_includes = include_graph.IncludeGraph()
+        for filename, (_, includes) in files.items():
+            for included in includes:
+                all_includes.add_include(filename, 0, included, False)
+        closures = all_includes.get_closures()
+
+        with self.connection:
+            for filename, (unit, includes) in changed.items():
+                self.connection.execute(
+                    'INSERT OR REPLACE INTO files VALUES (?, ?)',
+                    (filename, int(unit)))
+                self.connection.execute(
+                    'DELETE FROM includes WHERE filename = ?', (filename,))
+                self.connection.executemany(
+                    'INSERT INTO includes VALUES (?, ?)',
+                    [(filename, included) for included in sorted(includes)])
+            for unit in units:
+                self.connection.execute(
+                    'DELETE FROM dependents WHERE unit = ?', (unit,))
+                if not files[unit][0]:
+                    continue
+                self.connection.executemany(
+                    'INSERT INTO dependents VALUES (?, ?)',
+                    [(filename, unit)
+                     for filename in closures.get(unit, (unit,))])
+        return len(units)
+
+    def close(self):
+        self.connection.close()
@@ -0,0 +1,66 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Limit the time and the number of tokens spent on checking a file.
+
+The tokenizer and the parser check the limits as they go, and raise
+LimitExceeded to stop checking a file that exceeds them.
+
+"""
+
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import time
+
+
+class LimitExceeded(Exception):
+
+    """Raised when checking a file exceeds a limit."""
+
+
+class TimeLimitExceeded(LimitExceeded):
+
+    """Raised when checking a file takes too long."""
+
+
+class TokenLimitExceeded(LimitExceeded):
+
+    """Raised when a file has too many tokens."""
+
+
+class Limits(object):
+
+    """Time and token limits of checking a single file.
+
+    The time starts when Limits is created. A limit of None is no limit.
+
+    """
+
+    def __init__(self, max_seconds=None, max_tokens=None):
+        self.max_seconds = max_seconds
+        self.max_tokens = max_tokens
+        self.deadline = None
+        if max_seconds is not None:
+            self.deadline = time.time() + max_seconds
+
+    def check_time(self):
+        if self.deadline is not None and time.time() > self.deadline:
+            raise TimeLimitExceeded(
+                'took more than {} seconds'.format(self.max_seconds))
+
+    def check_tokens(self, count):
+        """Check the time and count, the number of tokens read so far."""
+        if self.max_tokens is not None and count > self.max_tokens:
+            raise TokenLimitExceeded(
+                'has more than {} tokens'.format(self.max_tokens))
+        self.check_time()
@@ -0,0 +1,144 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Measure the memory used to check each file and held by caches.
+
+The peak and the retained memory of each file are traced with
+tracemalloc, which is only available since Python 3.4. Tracing restarts
+for each file, so only the memory allocated while checking that file is
+counted. The size of cached objects, such as the modules cached by
+find_warnings.WarningHunter, is estimated with get_size().
+
+"""
+
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import contextlib
+import sys
+import types
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+
+# Objects whose size is shared with the whole program.
+_SHARED_TYPES = (type, types.ModuleType, types.FunctionType,
+                 types.BuiltinFunctionType, types.MethodType)
+
+
+class Error(Exception):
+
+    """Raised when memory cannot be traced."""
+
+
+def get_size(obj, seen=None):
+    """Return an estimate of the bytes used by obj and what it refers to.
+
+    Objects whose id is in seen are not counted again, so that a shared
+    seen set counts the objects shared by several objects only once.
+
+    """
+    if seen is None:
+        seen = set()
+    size = 0
+    pending = [obj]
+    while pending:
+        item = pending.pop()
+        if id(item) in seen or isinstance(item, _SHARED_TYPES):
+            continue
+        seen.add(id(item))
+        size += sys.getsizeof(item)
+        if isinstance(item, dict):
+            pending.extend(item.keys())
+            pending.extend(item.values())
+        elif isinstance(item, (list, tuple, set, frozenset)):
+            pending.extend(item)
+        elif hasattr(item, '__dict__'):
+            pending.append(item.__dict__)
+        elif hasattr(item, '__slots__'):
+            pending.extend([getattr(item, name) for name in item.__slots__
+                            if hasattr(item, name)])
+    return size
+
+
+def format_size(size):
+    for unit in ('B', 'KiB', 'MiB'):
+        if abs(size) < 1024:
+            return '{:.1f} {}'.format(size, unit)
+        size /= 1024.0
+    return '{:.1f} GiB'.format(size)
+
+
+class MemoryReport(object):
+
+    """Peak and retained memory of each file checked.
+
+    Nothing is traced if enabled is False.
+
+    """
+
+    def __init__(self, enabled=True):
+        if enabled and tracemalloc is None:
+            raise Error('tracing memory requires Python 3.4 or later')
+        self.enabled = enabled
+        # List of (filename, peak bytes, retained bytes).
+        self.files = []
+
+    @contextlib.contextmanager
+    def measure(self, filename):
+        """Trace the memory allocated by the block."""
+        if not self.enabled:
+            yield
+            return
+
+        tracemalloc.start()
+        try:
+            yield
+        finally:
+            retained, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            self.files.append((filename, peak, retained))
+
+    def get_largest_files(self, count):
+        """Return the count files with the highest peak."""
+        return sorted(self.files, key=lambda f: (-f[1], f[0]))[:count]
+
+    def print_summary(self, output_file, cache, count=10):
+        """Write the largest files and the largest modules of cache.
+
+        cache is a cache.LRUCache of filename: cached object.
+
+        """
+        output_file.write('{:>12} {:>12}  {}\n'.format(
+            'peak', 'retained', 'file'))
+        for filename, peak, retained in self.get_largest_files(count):
+            output_file.write('{:>12} {:>12}  {}\n'.format(
+                format_size(peak), format_size(retained), filename))
+
+        seen = set()
+        total = sum([get_size(value, seen) for value in cache.values()])
+        output_file.write('\nmodule cache: {} modules, {}\n'.format(
+            len(cache), format_size(total)))
+        output_file.write(
+            'module cache: {} hits, {} misses, {} evictions\n'.format(
+                cache.hits, cache.misses, cache.evictions))
+
+        sizes = sorted([(get_size(value), filename)
+                        for filename, value in cache.items()],
+                       key=lambda s: (-s[0], s[1]))
+        output_file.write('\nlargest cached modules:\n')
+        for size, filename in sizes[:count]:
+            output_file.write('{:>12}  {}\n'.format(format_size(size),
+                                                    filename))
@@ -17,17 +17,49 @@
 
 from __future__ import unicode_literals
 
+import array
+import bisect
+import re
+
 
 __author__ = 'nnorwitz@google.com (Neal Norwitz)'
 
 
+_NEWLINE = re.compile('\n')
+
+
 class Metrics(object):
 
     """Calculate various metrics on C++ source code."""
 
-    def __init__(self, source):
+    def __init__(self, source, newlines=None):
         self.source = source
+        # Sorted offsets of the newlines, built on the first lookup if
+        # not given.
+        self._newlines = newlines
+
+    def get_newlines(self):
+        """Return the sorted offsets of the newlines of the source."""
+        if self._newlines is None:
+            self._newlines = array.array(
+                str('l'), [m.start() for m in _NEWLINE.finditer(self.source)])
+        return self._newlines
 
     def get_line_number(self, index):
         """Return the line number in the source based on the index."""
-        return 1 + self.source.count('\n', 0, index)
+        return 1 + bisect.bisect_left(self.get_newlines(), index)
+
+    def get_line_numbers(self, indexes):
+        """Return the list of line numbers of all the indexes."""
+        if not indexes:
+            return []
+        newlines = self.get_newlines()
+        return [1 + bisect.bisect_left(newlines, i) for i in indexes]
+
+    def get_column(self, index):
+        """Return the column in the source based on the index."""
+        newlines = self.get_newlines()
+        line = bisect.bisect_left(newlines, index)
+        if line == 0:
+            return 1 + index
+        return index - newlines[line - 1]
@@ -14,45 +14,65 @@
 
 """Print classes which have a virtual method and non-virtual destructor."""
 
-from __future__ import print_function
 from __future__ import unicode_literals
 
 from . import ast
 from . import metrics
+from . import visitor
 
 
 __author__ = 'nnorwitz@google.com (Neal Norwitz)'
 
 
-def _find_warnings(filename, source, ast_list):
-    count = 0
-    for ast_node in ast_list:
-        if isinstance(ast_node, ast.Class) and ast_node.body:
-            class_node = ast_node
-            has_virtuals = False
-            for node in ast_node.body:
-                if isinstance(node, ast.Class) and node.body:
-                    _find_warnings(filename, source, [node])
-                elif (isinstance(node, ast.Function) and
-                      node.modifiers & ast.FUNCTION_VIRTUAL):
-                    has_virtuals = True
-                    if node.modifiers & ast.FUNCTION_DTOR:
-                        break
-            else:
-                if has_virtuals and not class_node.bases:
-                    lines = metrics.Metrics(source)
-                    print(
-                        '%s:%d' % (
-                            filename,
-                            lines.get_line_number(
-                                class_node.start)),
-                        end=' ')
-                    print("'{}' has virtual methods without a virtual "
-                          'dtor'.format(class_node.name))
-                    count += 1
-
-    return count
+class Checker(object):
+
+    """Find classes with virtual methods but no virtual destructor."""
+
+    streaming = True
+
+    def __init__(self, filename, source, src_metrics=None):
+        self.filename = filename
+        # src_metrics can be shared with the other checkers of the file.
+        self.metrics = src_metrics or metrics.Metrics(source)
+        # Stack of [class node, has virtuals, has virtual dtor].
+        self._classes = []
+        self._warnings = []
+
+    def register(self, ast_visitor):
+        ast_visitor.add_callback(ast.Class, self._enter_class)
+        ast_visitor.add_callback(ast.Function, self._visit_function)
+        ast_visitor.add_leave_callback(ast.Class, self._leave_class)
+
+    def _enter_class(self, node, parents):
+        if node.body:
+            self._classes.append([node, False, False])
+
+    def _visit_function(self, node, parents):
+        if (self._classes and parents and
+                parents[-1] is self._classes[-1][0] and
+                node.modifiers & ast.FUNCTION_VIRTUAL):
+            self._classes[-1][1] = True
+            if node.modifiers & ast.FUNCTION_DTOR:
+                self._classes[-1][2] = True
+
+    def _leave_class(self, node, parents):
+        if not node.body:
+            return
+        class_node, has_virtuals, has_virtual_dtor = self._classes.pop()
+        if has_virtuals and not has_virtual_dtor and not class_node.bases:
+            self._warnings.append((class_node.start, class_node.name))
+
+    def finish(self, reporter):
+        line_numbers = self.metrics.get_line_numbers(
+            [start for start, _ in self._warnings])
+        for line_number, (start, name) in zip(line_numbers, self._warnings):
+            reporter.add(self.filename, line_number,
+                         self.metrics.get_column(start),
+                         'nonvirtual-dtor',
+                         "'{}' has virtual methods without a virtual "
+                         'dtor'.format(name))
+        return len(self._warnings)
 
 
 def run(filename, source, entire_ast, include_paths, quiet):
-    return _find_warnings(filename, source, entire_ast)
+    return visitor.run([Checker(filename, source)], entire_ast)
@@ -0,0 +1,96 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Profile the checking of selected files with cProfile.
+
+Each profiled file gets its own .pstats file, and all of them are added
+up in AGGREGATE_NAME when the profiler is closed. They can be read with
+the pstats module, for example:
+
+    $ python -m pstats profiles/aggregate.pstats
+
+"""
+
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import contextlib
+import cProfile
+import fnmatch
+import hashlib
+import os
+import pstats
+import re
+
+
+AGGREGATE_NAME = 'aggregate.pstats'
+
+
+def get_profile_name(filename):
+    """Return the name of the .pstats file of filename.
+
+    The hash of filename keeps the names of different files apart, like
+    a/b.cc and a_b.cc.
+
+    """
+    digest = hashlib.sha1(filename.encode('utf-8')).hexdigest()[:8]
+    return '{}-{}.pstats'.format(re.sub(r'[^\w.-]', '_', filename), digest)
+
+
+class Profiler(object):
+
+    """Write a cProfile profile of each file matching pattern.
+
+    Nothing is profiled if directory is None.
+
+    """
+
+    def __init__(self, directory, pattern=None):
+        self.directory = directory
+        self.pattern = pattern
+        # Paths of the profiles written so far.
+        self.profiles = []
+        if directory is not None and not os.path.isdir(directory):
+            os.makedirs(directory)
+
+    def matches(self, filename):
+        if self.directory is None:
+            return False
+        return self.pattern is None or fnmatch.fnmatch(filename, self.pattern)
+
+    @contextlib.contextmanager
+    def profile(self, filename):
+        """Profile the block if filename matches the pattern."""
+        if not self.matches(filename):
+            yield
+            return
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            path = os.path.join(self.directory, get_profile_name(filename))
+            profiler.dump_stats(path)
+            # A file checked twice is only added up once.
+            if path not in self.profiles:
+                self.profiles.append(path)
+
+    def close(self):
+        """Write the aggregate profile of all the profiled files."""
+        if not self.profiles:
+            return
+        aggregate = pstats.Stats(self.profiles[0])
+        for path in self.profiles[1:]:
+            aggregate.add(path)
+        aggregate.dump_stats(os.path.join(self.directory, AGGREGATE_NAME))
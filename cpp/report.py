@@ -0,0 +1,134 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Collect warnings and write them out in batches.
+
+Checkers pass every warning to a Reporter as a structured record. The
+records are written in the order they are added, in one of FORMATS.
+
+"""
+
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import collections
+import json
+
+from . import __version__
+
+
+FORMATS = ('text', 'jsonl', 'sarif')
+
+# line and column are 1-based. A line of 0 means the whole file.
+Record = collections.namedtuple('Record',
+                                ['filename', 'line', 'column', 'check',
+                                 'message'])
+
+_SARIF_SCHEMA = 'https://json.schemastore.org/sarif-2.1.0.json'
+
+
+def format_text(record):
+    if record.line == 0:
+        return '{}: {}\n'.format(record.filename, record.message)
+    return '{}:{}: {}\n'.format(record.filename, record.line, record.message)
+
+
+def format_jsonl(record):
+    return json.dumps(dict(record._asdict()), sort_keys=True) + '\n'
+
+
+def _sarif_result(record):
+    location = {'artifactLocation': {'uri': record.filename}}
+    if record.line:
+        location['region'] = {'startLine': record.line,
+                              'startColumn': record.column}
+    return {'ruleId': record.check,
+            'level': 'warning',
+            'message': {'text': record.message},
+            'locations': [{'physicalLocation': location}]}
+
+
+def format_sarif(records):
+    """Return a SARIF 2.1.0 log of all the records."""
+    rules = sorted(set([r.check for r in records]))
+    log = {
+        '$schema': _SARIF_SCHEMA,
+        'version': '2.1.0',
+        'runs': [{
+            'tool': {'driver': {
+                'name': 'cppclean',
+                'version': __version__,
+                'informationUri': 'https://github.com/myint/cppclean',
+                'rules': [{'id': rule} for rule in rules]}},
+            'results': [_sarif_result(r) for r in records]}]}
+    return json.dumps(log, indent=2, sort_keys=True) + '\n'
+
+
+class MultiReporter(object):
+
+    """Pass every warning on to several reporters."""
+
+    def __init__(self, reporters):
+        self.reporters = reporters
+
+    def add(self, filename, line, column, check, message):
+        for reporter in self.reporters:
+            reporter.add(filename, line, column, check, message)
+
+    def close(self):
+        for reporter in self.reporters:
+            reporter.close()
+
+
+class Reporter(object):
+
+    """Buffer warnings and write them to output_file in batches."""
+
+    def __init__(self, output_file, output_format='text', batch_size=1000):
+        if output_format not in FORMATS:
+            raise ValueError('unknown format {}'.format(output_format))
+        self.output_file = output_file
+        self.output_format = output_format
+        self.batch_size = batch_size
+        self.count = 0
+        self._records = []
+
+    def add(self, filename, line, column, check, message):
+        self._records.append(Record(filename, line, column, check, message))
+        self.count += 1
+        if len(self._records) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """Write the buffered records.
+
+        A SARIF log is a single document, so its records are only written
+        by close().
+
+        """
+        if self.output_format == 'sarif' or not self._records:
+            return
+        if self.output_format == 'jsonl':
+            format_record = format_jsonl
+        else:
+            format_record = format_text
+        self.output_file.write(''.join([format_record(r)
+                                        for r in self._records]))
+        self._records = []
+
+    def close(self):
+        if self.output_format == 'sarif':
+            self.output_file.write(format_sarif(self._records))
+            self._records = []
+        else:
+            self.flush()
+        self.output_file.flush()
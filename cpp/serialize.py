@@ -0,0 +1,274 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Serialize parsed modules to a compact, versioned binary format.
+
+The encoding only knows about tokens and the cpp.ast node types. Each
+node becomes a tuple of a type tag followed by its constructor arguments,
+so decoding rebuilds the nodes by calling their constructors and never
+depends on pickling arbitrary object graphs.
+
+A serialized module is a fixed size header followed by a single marshal
+record. The header is validated before anything is decoded, and the
+record can be decoded straight out of a memory-mapped file.
+
+"""
+
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import array
+import gc
+import marshal
+import mmap
+import struct
+import sys
+
+from . import ast
+from . import find_warnings
+from . import tokenize
+
+
+MAGIC = b'CPPCLEAN'
+# Increment when the encoding of any node type changes.
+VERSION = 1
+
+# Magic, format version and length of the marshal record.
+_HEADER = struct.Struct(str('<8sII'))
+
+# marshal version 2 can be read by every supported Python version.
+_MARSHAL_VERSION = 2
+
+_TOKEN_TYPES = (tokenize.UNKNOWN, tokenize.SYNTAX, tokenize.CONSTANT,
+                tokenize.NAME, tokenize.PREPROCESSOR)
+_TOKEN_TYPE_INDEXES = dict((t, i) for i, t in enumerate(_TOKEN_TYPES))
+
+# Packed token arrays are always stored little-endian.
+_BIG_ENDIAN = sys.byteorder == 'big'
+
+try:
+    _tobytes = array.array.tobytes
+    _frombytes = array.array.frombytes
+except AttributeError:
+    # Python 2.
+    _tobytes = array.array.tostring
+    _frombytes = array.array.fromstring
+
+# Tags of the encoded values. Never reuse or renumber a tag without
+# incrementing VERSION.
+_TUPLE = 0
+_TOKENS = 1
+_LIST = 2
+
+# tag: (node class, attributes in constructor argument order)
+_NODE_TYPES = {
+    3: (ast.Define, ('start', 'end', 'name', 'definition')),
+    4: (ast.Include, ('start', 'end', 'filename', 'system')),
+    5: (ast.Expr, ('start', 'end', 'expr')),
+    6: (ast.Friend, ('start', 'end', 'expr', 'namespace')),
+    7: (ast.Using, ('start', 'end', 'names')),
+    8: (ast.Parameter, ('start', 'end', 'name', 'type', 'default')),
+    9: (ast.VariableDeclaration, ('start', 'end', 'name', 'type',
+                                  'initial_value', 'namespace')),
+    10: (ast.Typedef, ('start', 'end', 'name', 'alias', 'namespace')),
+    11: (ast.Enum, ('start', 'end', 'name', 'fields', 'namespace')),
+    12: (ast.Class, ('start', 'end', 'name', 'bases', 'templated_types',
+                     'body', 'namespace')),
+    13: (ast.Struct, ('start', 'end', 'name', 'bases', 'templated_types',
+                      'body', 'namespace')),
+    14: (ast.Union, ('start', 'end', 'name', 'bases', 'templated_types',
+                     'body', 'namespace')),
+    # Functions store their unconverted token sequences, which keeps the
+    # conversion lazy after decoding too.
+    15: (ast.Function, ('start', 'end', 'name', 'return_type_tokens',
+                        'parameter_tokens', 'specialization_tokens',
+                        'modifiers', 'templated_types', 'body',
+                        'namespace')),
+    16: (ast.Method, ('start', 'end', 'name', 'in_class',
+                      'return_type_tokens', 'parameter_tokens',
+                      'specialization_tokens', 'modifiers',
+                      'templated_types', 'body', 'namespace')),
+    17: (ast.Type, ('start', 'end', 'name', 'templated_types', 'modifiers',
+                    'reference', 'pointer', 'array')),
+}
+
+# Encoded values that need decoding; anything else is stored as is.
+_CONTAINER_TYPES = frozenset([tuple, dict])
+
+_NODE_TAGS = dict((cls, (tag, attributes))
+                  for tag, (cls, attributes) in _NODE_TYPES.items())
+
+
+class Error(Exception):
+
+    """Raised when serialized data cannot be decoded."""
+
+
+class _Encoder(object):
+
+    def __init__(self):
+        # Token names are stored once in a string table.
+        self.strings = []
+        self._string_indexes = {}
+
+    def _encode_tokens(self, tokens):
+        """Packs a list of tokens into a single array of ints."""
+        string_indexes = self._string_indexes
+        values = array.array(str('i'))
+        for token in tokens:
+            index = string_indexes.get(token.name)
+            if index is None:
+                index = string_indexes[token.name] = len(self.strings)
+                self.strings.append(token.name)
+            values.extend((index << 3 | _TOKEN_TYPE_INDEXES[token.token_type],
+                           token.start, token.end))
+        if _BIG_ENDIAN:
+            values.byteswap()
+        return (_TOKENS, _tobytes(values))
+
+    def encode(self, value):
+        if isinstance(value, list):
+            if value and all([isinstance(v, tokenize.Token) for v in value]):
+                return self._encode_tokens(value)
+            values = [self.encode(v) for v in value]
+            if any([type(v) in _CONTAINER_TYPES for v in values]):
+                return (_LIST,) + tuple(values)
+            # Lists of plain values come out of marshal ready to use.
+            return values
+        if isinstance(value, ast.Node):
+            tag, attributes = _NODE_TAGS[value.__class__]
+            return (tag,) + tuple([self.encode(getattr(value, a))
+                                   for a in attributes])
+        if isinstance(value, tokenize.Token):
+            return (_TOKENS, self._encode_tokens([value])[1], True)
+        if isinstance(value, tuple):
+            return (_TUPLE,) + tuple([self.encode(v) for v in value])
+        if isinstance(value, dict):
+            return dict([(k, self.encode(v)) for k, v in value.items()])
+        return value
+
+
+class _Decoder(object):
+
+    def __init__(self, strings):
+        self.strings = strings
+
+    def _decode_tokens(self, data):
+        values = array.array(str('i'))
+        _frombytes(values, data)
+        if _BIG_ENDIAN:
+            values.byteswap()
+        strings = self.strings
+        token = tokenize.Token
+        it = iter(values)
+        return [token(_TOKEN_TYPES[kind & 7], strings[kind >> 3], start, end)
+                for kind, start, end in zip(it, it, it)]
+
+    def decode(self, value):
+        value_type = type(value)
+        if value_type is tuple:
+            tag = value[0]
+            if tag == _TOKENS:
+                tokens = self._decode_tokens(value[1])
+                if len(value) > 2:
+                    # A single token rather than a list of tokens.
+                    return tokens[0]
+                return tokens
+            decode = self.decode
+            values = [decode(v) if type(v) in _CONTAINER_TYPES else v
+                      for v in value[1:]]
+            if tag == _LIST:
+                return values
+            if tag == _TUPLE:
+                return tuple(values)
+            try:
+                cls = _NODE_TYPES[tag][0]
+            except KeyError:
+                raise Error('unknown tag {}'.format(tag))
+            return cls(*values)
+        if value_type is dict:
+            return dict([(k, self.decode(v)) for k, v in value.items()])
+        return value
+
+
+def dumps(module):
+    """Returns the serialized bytes of a find_warnings.Module."""
+    ast_list = module.ast_list
+    public_symbols = None
+    if ast_list is not None:
+        # Store the public symbols as indexes so that they are still the
+        # same objects as the nodes in ast_list after decoding.
+        indexes = dict((id(node), i) for i, node in enumerate(ast_list))
+        public_symbols = [[name, indexes[id(node)]]
+                          for name, node in module.public_symbols.items()]
+        encoder = _Encoder()
+        encoded = encoder.encode(ast_list)
+        ast_list = [encoder.strings, encoded]
+    data = marshal.dumps([module.filename, ast_list, public_symbols],
+                         _MARSHAL_VERSION)
+    return _HEADER.pack(MAGIC, VERSION, len(data)) + data
+
+
+def loads(data):
+    """Returns the find_warnings.Module serialized in data.
+
+    data can be any buffer, including a memory-mapped file.
+
+    """
+    if len(data) < _HEADER.size:
+        raise Error('truncated header')
+    magic, version, length = _HEADER.unpack(data[:_HEADER.size])
+    if magic != MAGIC:
+        raise Error('not a serialized module')
+    if version != VERSION:
+        raise Error('unsupported version {}'.format(version))
+    end = _HEADER.size + length
+    if len(data) < end:
+        raise Error('truncated data')
+
+    try:
+        filename, ast_list, public_symbols = marshal.loads(
+            data[_HEADER.size:end])
+    except (EOFError, ValueError, TypeError) as exception:
+        raise Error(exception)
+
+    if ast_list is None:
+        return find_warnings.Module(filename, None)
+    strings, ast_list = ast_list
+    # Decoding only allocates, so the cyclic garbage collector would
+    # repeatedly scan a growing heap without ever finding garbage.
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        ast_list = _Decoder(strings).decode(ast_list)
+    finally:
+        if gc_enabled:
+            gc.enable()
+    return find_warnings.Module(
+        filename, ast_list,
+        dict([(name, ast_list[i]) for name, i in public_symbols]))
+
+
+def dump(module, filename):
+    """Writes module serialized to filename."""
+    with open(filename, 'wb') as output_file:
+        output_file.write(dumps(module))
+
+
+def load(filename):
+    """Returns the module serialized in filename using a memory map."""
+    with open(filename, 'rb') as input_file:
+        data = mmap.mmap(input_file.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            return loads(data)
+        finally:
+            data.close()
@@ -14,106 +14,102 @@
 
 """Print classes, functions and modules which contain static data."""
 
-from __future__ import print_function
 from __future__ import unicode_literals
 
 import collections
 
 from . import ast
 from . import metrics
+from . import visitor
 
 
 __author__ = 'nnorwitz@google.com (Neal Norwitz)'
 
 
-def _find_warnings(filename, lines, ast_list, static_is_optional):
-    def print_warning(node):
-        for name in node.name.split(','):
-            print("{}:{}: static data '{}'".format(
-                filename,
-                lines.get_line_number(node.start),
-                name))
-
-    def find_static(function_node):
-        tokens = []
-        static_found = False
-        for node in function_node.body:
-            if node.name == 'static':
-                static_found = True
-
-            if static_found:
-                tokens.append(node)
-                if node.name == ';':
-                    body = list(
-                        ast.ASTBuilder(iter(tokens), filename).generate())
-                    _find_warnings(filename, lines, body, False)
-                    tokens = []
-                    static_found = False
-
-    count = 0
-    for node in ast_list:
-        if isinstance(node, ast.VariableDeclaration):
-            # Ignore 'static' at module scope so we can find globals too.
-            is_static = 'static' in node.type.modifiers
-            is_not_const = (
-                'const' not in node.type.modifiers and
-                'constexpr' not in node.type.modifiers
-            )
-
-            if is_not_const and (static_is_optional or is_static):
-                print_warning(node)
-                count += 1
-        elif isinstance(node, ast.Function) and node.body:
-            find_static(node)
-        elif isinstance(node, ast.Class) and node.body:
-            _find_warnings(filename, lines, node.body, False)
-
-    return count
+class Checker(object):
 
+    """Find static data and unused static variables."""
 
-def _get_static_declarations(ast_list):
-    for node in ast_list:
-        if (isinstance(node, ast.VariableDeclaration) and
-                'static' in node.type.modifiers):
-            for name in node.name.split(','):
-                yield (name, node)
+    streaming = True
 
+    def __init__(self, filename, source, src_metrics=None):
+        self.filename = filename
+        # src_metrics can be shared with the other checkers of the file.
+        self.metrics = src_metrics or metrics.Metrics(source)
+        self._static_data_warnings = []
+        # Tokens of the static declaration being read in a function body.
+        self._static_tokens = None
+        # Map name: module level static declaration.
+        self._static_declarations = {}
+        self._name_counts = collections.Counter()
 
-def _find_unused_static_warnings(filename, lines, ast_list):
-    """Warn about unused static variables."""
-    static_declarations = dict(_get_static_declarations(ast_list))
+    def register(self, ast_visitor):
+        ast_visitor.add_callback(ast.VariableDeclaration, self._visit_variable)
+        ast_visitor.add_callback(ast.Function, self._visit_function)
+        ast_visitor.add_token_callback(self._visit_token)
 
-    def find_variables_use(body):
-        for child in body:
-            if child.name in static_declarations:
-                static_use_counts[child.name] += 1
+    def _check_variable(self, node, static_is_optional):
+        # Ignore 'static' at module scope so we can find globals too.
+        is_static = 'static' in node.type.modifiers
+        is_not_const = (
+            'const' not in node.type.modifiers and
+            'constexpr' not in node.type.modifiers
+        )
 
-    static_use_counts = collections.Counter()
-    for node in ast_list:
-        if isinstance(node, ast.Function) and node.body:
-            find_variables_use(node.body)
-        elif isinstance(node, ast.Class) and node.body:
-            for child in node.body:
-                if isinstance(child, ast.Function) and child.body:
-                    find_variables_use(child.body)
+        if is_not_const and (static_is_optional or is_static):
+            self._static_data_warnings.extend(
+                [(node.start, name) for name in node.name.split(',')])
 
-    count = 0
-    for (name, _) in sorted(static_declarations.items(),
-                            key=lambda x: x[1].start):
-        if not static_use_counts[name]:
-            print("{}:{}: unused variable '{}'".format(
-                filename,
-                lines.get_line_number(static_declarations[name].start),
-                name))
-            count += 1
+    def _visit_variable(self, node, parents):
+        self._check_variable(node, static_is_optional=not parents)
+        if not parents and 'static' in node.type.modifiers:
+            for name in node.name.split(','):
+                self._static_declarations[name] = node
+
+    def _visit_function(self, node, parents):
+        self._static_tokens = None
+
+    def _visit_token(self, token, function, parents):
+        if token.name == 'static' and self._static_tokens is None:
+            self._static_tokens = []
+
+        if self._static_tokens is not None:
+            self._static_tokens.append(token)
+            if token.name == ';':
+                body = ast.ASTBuilder(iter(self._static_tokens),
+                                      self.filename).generate()
+                for node in body:
+                    if isinstance(node, ast.VariableDeclaration):
+                        self._check_variable(node, static_is_optional=False)
+                self._static_tokens = None
+
+        # Only count uses in functions at module scope and their methods.
+        if len(parents) <= 1:
+            self._name_counts[token.name] += 1
+
+    def finish(self, reporter):
+        line_numbers = self.metrics.get_line_numbers(
+            [start for start, _ in self._static_data_warnings])
+        for line_number, (start, name) in zip(line_numbers,
+                                              self._static_data_warnings):
+            reporter.add(self.filename, line_number,
+                         self.metrics.get_column(start),
+                         'static-data',
+                         "static data '{}'".format(name))
+
+        count = len(self._static_data_warnings)
+        for (name, node) in sorted(self._static_declarations.items(),
+                                   key=lambda x: x[1].start):
+            if not self._name_counts[name]:
+                reporter.add(self.filename,
+                             self.metrics.get_line_number(node.start),
+                             self.metrics.get_column(node.start),
+                             'unused-variable',
+                             "unused variable '{}'".format(name))
+                count += 1
 
-    return count
+        return count
 
 
 def run(filename, source, entire_ast, include_paths, quiet):
-    lines = metrics.Metrics(source)
-
-    return (
-        _find_warnings(filename, lines, entire_ast, True) +
-        _find_unused_static_warnings(filename, lines, entire_ast)
-    )
+    return visitor.run([Checker(filename, source)], entire_ast)
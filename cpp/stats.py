@@ -0,0 +1,225 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Measure the time spent in each phase of checking each file.
+
+Nothing is measured until enable() is called, and the functions of this
+module cost next to nothing until then.
+
+Phases nest. Time spent in a nested phase, such as parsing an #included
+header during include resolution, is only charged to the nested phase.
+Tokenizing, parsing and checking are interleaved, because the AST is
+streamed, so the time spent producing each token and each node is
+charged as it happens.
+
+"""
+
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import collections
+import time
+
+
+try:
+    _cpu_time = time.process_time
+except AttributeError:
+    # Python 2.
+    _cpu_time = time.clock
+
+# Phases in the order they are printed, before any other phase.
+PHASES = ('read', 'tokenize', 'parse', 'include resolution', 'symbol table')
+
+_stats = None
+
+
+class Stats(object):
+
+    """Wall and CPU time of each phase of each file."""
+
+    def __init__(self):
+        # Map filename: {phase: [wall seconds, CPU seconds]}.
+        self.files = collections.OrderedDict()
+        self.counts = collections.Counter()
+        # Times of the current file.
+        self._times = {}
+        self._stack = []
+        self._mark = None
+
+    def start_file(self, filename):
+        self._times = self.files.setdefault(filename, {})
+
+    def _switch(self):
+        now = (time.time(), _cpu_time())
+        if self._stack:
+            times = self._times.setdefault(self._stack[-1], [0.0, 0.0])
+            times[0] += now[0] - self._mark[0]
+            times[1] += now[1] - self._mark[1]
+        self._mark = now
+
+    def enter(self, name):
+        self._switch()
+        self._stack.append(name)
+
+    def leave(self):
+        self._switch()
+        self._stack.pop()
+
+    def get_phase_totals(self):
+        """Return a list of (phase, wall seconds, CPU seconds)."""
+        totals = collections.defaultdict(lambda: [0.0, 0.0])
+        for times in self.files.values():
+            for name, (wall, cpu) in times.items():
+                totals[name][0] += wall
+                totals[name][1] += cpu
+        names = ([n for n in PHASES if n in totals] +
+                 sorted([n for n in totals if n not in PHASES]))
+        return [(n, totals[n][0], totals[n][1]) for n in names]
+
+    def get_slowest_files(self, count):
+        """Return a list of (wall seconds, CPU seconds, filename)."""
+        files = [(sum([t[0] for t in times.values()]),
+                  sum([t[1] for t in times.values()]),
+                  filename)
+                 for filename, times in self.files.items()]
+        files.sort(key=lambda f: (-f[0], f[2]))
+        return files[:count]
+
+    def print_summary(self, output_file, count=10):
+        totals = self.get_phase_totals()
+        output_file.write('{:<32} {:>10} {:>10}\n'.format(
+            'phase', 'wall (s)', 'cpu (s)'))
+        for name, wall, cpu in totals:
+            output_file.write('{:<32} {:10.3f} {:10.3f}\n'.format(
+                name, wall, cpu))
+        output_file.write('{:<32} {:10.3f} {:10.3f}\n'.format(
+            'total',
+            sum([t[1] for t in totals]),
+            sum([t[2] for t in totals])))
+
+        output_file.write('\nmodule cache: {} hits, {} misses\n'.format(
+            self.counts['module cache hit'],
+            self.counts['module cache miss']))
+
+        output_file.write('\nslowest files:\n')
+        for wall, cpu, filename in self.get_slowest_files(count):
+            output_file.write('{:10.3f} {:10.3f}  {}\n'.format(
+                wall, cpu, filename))
+
+
+class _Phase(object):
+
+    def __init__(self, stats, name):
+        self.stats = stats
+        self.name = name
+
+    def __enter__(self):
+        self.stats.enter(self.name)
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stats.leave()
+
+
+class _NoPhase(object):
+
+    def __enter__(self):
+        pass
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        pass
+
+
+_NO_PHASE = _NoPhase()
+
+
+class _TimedVisitor(object):
+
+    """Register callbacks on a visitor.Visitor, timing them as a phase."""
+
+    def __init__(self, visitor, name):
+        self.visitor = visitor
+        self.name = name
+
+    def _timed(self, callback):
+        stats = _stats
+
+        def timed_callback(*args):
+            stats.enter(self.name)
+            try:
+                return callback(*args)
+            finally:
+                stats.leave()
+        return timed_callback
+
+    def add_callback(self, node_types, callback):
+        self.visitor.add_callback(node_types, self._timed(callback))
+
+    def add_leave_callback(self, node_types, callback):
+        self.visitor.add_leave_callback(node_types, self._timed(callback))
+
+    def add_token_callback(self, callback):
+        self.visitor.add_token_callback(self._timed(callback))
+
+
+def enable():
+    """Start measuring and return the Stats."""
+    global _stats
+    _stats = Stats()
+    return _stats
+
+
+def disable():
+    global _stats
+    _stats = None
+
+
+def start_file(filename):
+    if _stats is not None:
+        _stats.start_file(filename)
+
+
+def phase(name):
+    """Return a context manager that times its block as phase name."""
+    if _stats is None:
+        return _NO_PHASE
+    return _Phase(_stats, name)
+
+
+def count(name):
+    if _stats is not None:
+        _stats.counts[name] += 1
+
+
+def timed(name, iterable):
+    """Return iterable, timing the production of each item as phase name."""
+    if _stats is None:
+        return iterable
+    return _timed(_stats, name, iter(iterable))
+
+
+def _timed(stats, name, iterator):
+    while True:
+        stats.enter(name)
+        try:
+            item = next(iterator)
+        except StopIteration:
+            return
+        finally:
+            stats.leave()
+        yield item
+
+
+def timed_visitor(visitor, name):
+    """Return visitor, timing the callbacks registered on it as name."""
+    if _stats is None:
+        return visitor
+    return _TimedVisitor(visitor, name)
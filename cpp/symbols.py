@@ -27,92 +27,93 @@ class Error(BaseException):
     """Exception raised when lookup fails."""
 
 
-class Symbol(object):
+def _find(symbols, namespace_paths, path, parts):
+    """Helper for find_symbol that only looks up parts in a namespace of a
+    table.
+
+    Args:
+      symbols: symbols of the table
+      namespace_paths: namespace paths of the table
+      path: path of the namespace
+      parts: ['names', 'separated', 'by', '::']
+
+    Returns:
+      (ast.Node, module) of the first symbol on the way, as long as
+      the parts before it are namespaces, or None.
+
+    """
+    for part in parts:
+        path += (part,)
+        result = symbols.get(path)
+        if result is not None:
+            return result
+        if path not in namespace_paths:
+            break
+    return None
 
-    """Data container used internally."""
 
-    def __init__(self, name, parts, namespace_stack):
-        self.name = name
-        self.parts = parts
-        self.namespace_stack = namespace_stack
+class SymbolTable(object):
 
+    """Symbol table that can perform namespace operations.
 
-class SymbolTable(object):
+    A symbol is looked up in the table itself, then in each of its layers,
+    from the last one added. Layers are the SymbolTables of other modules,
+    which are shared, so they must not change once they are added.
 
-    """Symbol table that can perform namespace operations."""
+    """
 
     def __init__(self):
         # None is the global namespace.
         self.namespaces = {None: {}}
-
-    def _lookup_namespace(self, symbol, namespace):
-        """Helper for lookup_symbol that only looks up variables in a
-        namespace.
-
-        Args:
-          symbol: Symbol
-          namespace: pointer into self.namespaces
-
-        """
-        for namespace_part in symbol.parts:
-            namespace = namespace.get(namespace_part)
-            if namespace is None:
-                break
-            if not isinstance(namespace, dict):
-                return namespace
-        raise Error('%s not found' % symbol.name)
-
-    def _lookup_global(self, symbol):
-        """Helper for lookup_symbol that only looks up global variables.
-
-        Args:
-          symbol: Symbol
+        self.layers = []
+        # The same symbols, flattened for lookups. A path is the tuple of
+        # the keys of the symbol or the namespace in self.namespaces.
+        # Map symbol path: (node, module).
+        self.symbols = {}
+        # Set of namespace paths.
+        self.namespace_paths = set([(), (None,)])
+        # The symbols, and the (symbols, namespace_paths), of this table
+        # and its layers in the order they are looked up. The tables are
+        # not kept, so that a table does not reference itself.
+        self._all_symbols = [self.symbols]
+        self._tables = [(self.symbols, self.namespace_paths)]
+        # The length of the longest namespace path of this table and its
+        # layers. The names deeper in a namespace stack are not namespaces.
+        self.namespace_depth = 0
+
+    def add_layer(self, layer):
+        """Look up the symbols of the SymbolTable layer too.
+
+        The symbols of the layers of layer are not looked up.
 
         """
-        assert symbol.parts
-        namespace = self.namespaces
-        if len(symbol.parts) == 1:
-            # If there is only one part, look in globals.
-            namespace = self.namespaces[None]
-        try:
-            # Try to do a normal, global namespace lookup.
-            return self._lookup_namespace(symbol, namespace)
-        except Error as orig_exc:
-            try:
-                # The normal lookup can fail if all of the parts aren't
-                # namespaces. This happens with OuterClass::Inner.
-                namespace = self.namespaces[None]
-                return self._lookup_namespace(symbol, namespace)
-            except Error:
-                raise orig_exc
-
-    def _lookup_in_all_namespaces(self, symbol):
-        """Helper for lookup_symbol that looks for symbols in all namespaces.
-
-        Args:
-          symbol: Symbol
-
-        """
-        namespace = self.namespaces
-        # Create a stack of namespaces.
-        namespace_stack = []
-        for current in symbol.namespace_stack:
-            namespace = namespace.get(current)
-            if namespace is None or not isinstance(namespace, dict):
-                break
-            namespace_stack.append(namespace)
-
-        # Iterate through the stack in reverse order. Need to go from
-        # innermost namespace to outermost.
-        for namespace in reversed(namespace_stack):
-            try:
-                return self._lookup_namespace(symbol, namespace)
-            except Error:
-                pass
+        self.layers.append(layer)
+        self._all_symbols.insert(1, layer.symbols)
+        self._tables.insert(1, (layer.symbols, layer.namespace_paths))
+        self.namespace_depth = max(self.namespace_depth,
+                                   layer.namespace_depth)
+
+    def _find_in_tables(self, path, parts):
+        """Helper for find_symbol that looks up parts in a namespace of
+        this table, then of each layer."""
+        if len(parts) == 1:
+            # The namespace of the symbol exists if the symbol does.
+            path += (parts[0],)
+            for table_symbols in self._all_symbols:
+                result = table_symbols.get(path)
+                if result is not None:
+                    return result
+            return None
+
+        for symbols, namespace_paths in self._tables:
+            if path in namespace_paths:
+                result = _find(symbols, namespace_paths, path, parts)
+                if result is not None:
+                    return result
         return None
 
-    def lookup_symbol(self, name, namespace_stack):
-        """Returns AST node and module for symbol if found.
+    def find_symbol(self, name, namespace_stack):
+        """Returns AST node and module for symbol, or None if not found.
 
         Args:
           name: 'name of the symbol to lookup'
@@ -121,9 +122,6 @@ class SymbolTable(object):
         Returns:
           (ast.Node, module (ie, any object stored with symbol)) if found
 
-        Raises:
-          Error if the symbol cannot be found.
-
         """
         # TODO(nnorwitz): a convenient API for this depends on the
         # representation of the name. e.g., does symbol_name contain
@@ -132,17 +130,44 @@ class SymbolTable(object):
         # semantics (if leading ::) or change the desirable API.
 
         # For now assume that the symbol_name contains :: and parse it.
-        symbol = Symbol(name, name.split('::'), namespace_stack)
-        assert symbol.parts
-        if symbol.parts[0] == '':
+        parts = name.split('::')
+        if parts[0] == '':
             # Handle absolute (global) ::symbol_names.
-            symbol.parts = symbol.parts[1:]
-        elif namespace_stack is not None:
-            result = self._lookup_in_all_namespaces(symbol)
-            if result:
+            parts = parts[1:]
+        elif namespace_stack:
+            # Go from innermost namespace to outermost. The names deeper
+            # than the longest namespace path cannot lead to the symbol.
+            depth = min(len(namespace_stack), self.namespace_depth)
+            for depth in range(depth, 0, -1):
+                result = self._find_in_tables(tuple(namespace_stack[:depth]),
+                                              parts)
+                if result is not None:
+                    return result
+
+        if len(parts) == 1:
+            # If there is only one part, look in globals.
+            return self._find_in_tables((None,), parts)
+        result = self._find_in_tables((), parts)
+        if result is not None:
+            return result
+        for symbols, namespace_paths in self._tables:
+            # The normal lookup can fail if all of the parts aren't
+            # namespaces. This happens with OuterClass::Inner.
+            result = _find(symbols, namespace_paths, (None,), parts)
+            if result is not None:
                 return result
+        return None
+
+    def lookup_symbol(self, name, namespace_stack):
+        """Returns AST node and module for symbol if found.
 
-        return self._lookup_global(symbol)
+        Like find_symbol(), but raises Error if the symbol cannot be found.
+
+        """
+        result = self.find_symbol(name, namespace_stack)
+        if result is None:
+            raise Error('%s not found' % name)
+        return result
 
     def _add(self, symbol_name, namespace, node, module):
         """Helper function for adding symbols.
@@ -154,6 +179,22 @@ class SymbolTable(object):
         namespace[symbol_name] = node, module
         return not result
 
+    def _add_path(self, symbol_name, namespace_stack, node, module):
+        """Helper function for adding symbols to the flat index.
+
+        See add_symbol().
+
+        """
+        if namespace_stack:
+            path = ()
+            for namespace in namespace_stack:
+                path += (namespace,)
+                self.namespace_paths.add(path)
+            self.namespace_depth = max(self.namespace_depth, len(path))
+        else:
+            path = (None,)
+        self.symbols[path + (symbol_name,)] = node, module
+
     def add_symbol(self, symbol_name, namespace_stack, node, module):
         """Adds symbol_name defined in namespace_stack to the symbol table.
 
@@ -175,6 +216,7 @@ class SymbolTable(object):
                 last_namespace = last_namespace.setdefault(namespace, {})
         else:
             last_namespace = self.namespaces[None]
+        self._add_path(symbol_name, namespace_stack, node, module)
         return self._add(symbol_name, last_namespace, node, module)
 
     def get_namespace(self, name_seq):
@@ -187,11 +229,12 @@ class SymbolTable(object):
           ['names', 'that', 'are', 'namespaces', 'possibly', 'empty', 'list']
 
         """
-        namespaces = self.namespaces
-        result = []
-        for name in name_seq:
-            namespaces = namespaces.get(name)
-            if not namespaces:
-                break
-            result.append(name)
-        return result
+        longest = 0
+        for _, namespace_paths in self._tables:
+            path = ()
+            for name in name_seq:
+                path += (name,)
+                if path not in namespace_paths:
+                    break
+                longest = max(longest, len(path))
+        return list(name_seq[:longest])
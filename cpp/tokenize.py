@@ -61,6 +61,9 @@ class Token(object):
 
     """
 
+    # Functions keep their tokens, so tokens are many and small.
+    __slots__ = ('token_type', 'name', 'start', 'end')
+
     def __init__(self, token_type, name, start, end):
         self.token_type = token_type
         self.name = name
@@ -101,11 +104,12 @@ def _get_char(source, start, i):
     return i + 1 if i != -1 else start + 1
 
 
-def get_tokens(source):
+def get_tokens(source, limits=None):
     """Returns a sequence of Tokens.
 
     Args:
       source: string of C++ source code.
+      limits: limits.Limits checked for each token, or None.
 
     Yields:
       Token that represents the next token in the source.
@@ -122,6 +126,7 @@ def get_tokens(source):
 
     # Ignore tokens while in a #if 0 block.
     count_ifs = 0
+    count_tokens = 0
 
     i = 0
     end = len(source)
@@ -278,6 +283,10 @@ def get_tokens(source):
         else:
             raise TokenError("unexpected token '{0}'".format(c))
 
+        if limits is not None:
+            count_tokens += 1
+            limits.check_tokens(count_tokens)
+
         if count_ifs:
             continue
 
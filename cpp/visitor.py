@@ -0,0 +1,160 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Walk an AST once on behalf of several checkers.
+
+Checkers register callbacks for the node types and function body tokens
+they are interested in. The visitor then walks the AST, including the
+bodies of classes, structs and unions, exactly once and dispatches every
+node to the registered callbacks.
+
+A checker is any object with these methods:
+
+    register(visitor): add the checker's callbacks to visitor.
+    finish(reporter): called after the walk; add the warnings to the
+        report.Reporter and return how many were found.
+
+A checker may also set streaming to True if it does not need the whole
+file to be parsed before its callbacks are called. When every checker
+is streaming, the AST is walked while it is being generated and no more
+than a single top-level declaration is kept in memory at a time.
+
+"""
+
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import sys
+
+from . import ast
+from . import report
+from . import stats
+
+
+class Visitor(object):
+
+    """Dispatch the nodes of an AST to registered callbacks."""
+
+    def __init__(self):
+        # List of (node types, callback) in registration order.
+        self._enter_callbacks = []
+        self._leave_callbacks = []
+        self._token_callbacks = []
+        # Cache node class: (enter callbacks, leave callbacks).
+        self._dispatch = {}
+
+    def add_callback(self, node_types, callback):
+        """Call callback(node, parents) when entering a node of node_types.
+
+        parents is the list of the enclosing class, struct and union
+        nodes. It is updated in place during the walk, so callbacks must
+        copy it to keep it.
+
+        """
+        self._enter_callbacks.append((node_types, callback))
+        self._dispatch.clear()
+
+    def add_leave_callback(self, node_types, callback):
+        """Call callback(node, parents) after the body of a node."""
+        self._leave_callbacks.append((node_types, callback))
+        self._dispatch.clear()
+
+    def add_token_callback(self, callback):
+        """Call callback(token, function, parents) for each body token."""
+        self._token_callbacks.append(callback)
+
+    def _get_callbacks(self, cls):
+        try:
+            return self._dispatch[cls]
+        except KeyError:
+            callbacks = (
+                [c for types, c in self._enter_callbacks
+                 if issubclass(cls, types)],
+                [c for types, c in self._leave_callbacks
+                 if issubclass(cls, types)])
+            self._dispatch[cls] = callbacks
+            return callbacks
+
+    def walk(self, ast_list):
+        """Dispatch every node of ast_list and of the nested bodies.
+
+        ast_list can be any iterable, such as ASTBuilder.generate().
+
+        """
+        parents = []
+        # Stack of iterators over the bodies being walked.
+        stack = [iter(ast_list)]
+        while stack:
+            for node in stack[-1]:
+                enter, leave = self._get_callbacks(node.__class__)
+                for callback in enter:
+                    callback(node, parents)
+
+                if isinstance(node, ast.Class) and node.body:
+                    # Walk the body before the rest of this sequence.
+                    parents.append(node)
+                    stack.append(iter(node.body))
+                    break
+
+                if (self._token_callbacks and
+                        isinstance(node, ast.Function) and node.body):
+                    for token in node.body:
+                        for callback in self._token_callbacks:
+                            callback(token, node, parents)
+
+                for callback in leave:
+                    callback(node, parents)
+            else:
+                stack.pop()
+                if parents:
+                    node = parents.pop()
+                    for callback in self._get_callbacks(node.__class__)[1]:
+                        callback(node, parents)
+
+
+def run(checkers, ast_list, reporter=None):
+    """Run checkers over ast_list and return the number of warnings.
+
+    ast_list can be any iterable of AST nodes. If the iterable raises an
+    exception, no checker is finished. Without a reporter, the warnings
+    are printed as text.
+
+    """
+    ast_list = (node for node in ast_list if node)
+    if not all([getattr(c, 'streaming', False) for c in checkers]):
+        # Make sure the whole file parses before any callback is called.
+        ast_list = list(ast_list)
+
+    visitor = Visitor()
+    for checker in checkers:
+        checker.register(stats.timed_visitor(visitor, _get_phase(checker)))
+    visitor.walk(ast_list)
+    if reporter is not None:
+        return _finish(checkers, reporter)
+
+    reporter = report.Reporter(sys.stdout)
+    try:
+        return _finish(checkers, reporter)
+    finally:
+        reporter.close()
+
+
+def _get_phase(checker):
+    return 'check ' + checker.__class__.__module__.split('.')[-1]
+
+
+def _finish(checkers, reporter):
+    count = 0
+    for checker in checkers:
+        with stats.phase(_get_phase(checker)):
+            count += checker.finish(reporter)
+    return count
@@ -126,6 +126,13 @@ def Type(name, start=0, end=0, templated_types=None, modifiers=None,
                     reference, pointer, array)
 
 
+def Parameter(name, parameter_type, default=None, start=0, end=0):
+    if default is None:
+        default = []
+
+    return ast.Parameter(start, end, name, parameter_type, default)
+
+
 def Function(name, return_type, parameters, start=0, end=0,
              specializations=None, modifiers=0, templated_types=None,
              body=None, namespace=None):
@@ -175,6 +182,78 @@ class CoverageTest(unittest.TestCase):
         self.assertFalse(Type('Foo') == Typedef('Foo'))
 
 
+class FunctionLazyConversionTest(unittest.TestCase):
+
+    # code, return type, parameters, specializations, is_exportable(),
+    # as the eager conversion gave them.
+    _CASES = [
+        ('void fn();', Type('void'), [], [], True),
+        ('static int fn(int a, const Foo& b = Foo());',
+         Type('int', modifiers=['static']),
+         [Parameter('a', Type('int')),
+          Parameter('b', Type('Foo', modifiers=['const'], reference=True),
+                    list(get_tokens('Foo()')))],
+         [], False),
+        ('constexpr const char* fn() { return 0; }',
+         Type('char', modifiers=['constexpr', 'const'], pointer=True),
+         [], [], False),
+        ('std::map<int, std::vector<Foo*> > fn(Bar<int> a) {}',
+         Type('std::map',
+              templated_types=[Type('int'),
+                               Type('std::vector',
+                                    templated_types=[Type('Foo',
+                                                          pointer=True)])]),
+         [Parameter('a', Type('Bar', templated_types=[Type('int')]))],
+         [], True),
+        ('template <> void fn<int, 0>(int a);', Type('void'),
+         [Parameter('a', Type('int'))], [Type('int'), Type('0')], True),
+        ('namespace { inline static Foo fn(); }',
+         Type('Foo', modifiers=['static']), [], [], False),
+        ('namespace ns { unsigned long fn(...) {} }',
+         Type('unsigned long'), [Parameter(None, Type('...'))], [], True),
+        ('class Foo { static const Foo& fn() const; };',
+         Type('Foo', modifiers=['static', 'const'], reference=True),
+         [], [], False),
+    ]
+    _CODE = [case[0] for case in _CASES]
+
+    def _get_function(self, code):
+        functions = []
+        nodes = list(MakeBuilder(code).generate())
+        while nodes:
+            node = nodes.pop()
+            if isinstance(node, ast.Function):
+                functions.append(node)
+            elif isinstance(node, ast.Class):
+                nodes.extend(node.body or [])
+        self.assertEqual(1, len(functions), code)
+        return functions[0]
+
+    def test_conversion_is_deferred(self):
+        for code in self._CODE:
+            function = self._get_function(code)
+            function.is_exportable()
+            function.is_declaration()
+            self.assertIs(ast._NOT_CONVERTED, function._return_type)
+            self.assertIs(ast._NOT_CONVERTED, function._parameters)
+            self.assertIs(ast._NOT_CONVERTED, function._specializations)
+
+            return_type = function.return_type
+            self.assertIsNot(ast._NOT_CONVERTED, function._return_type)
+            self.assertIs(return_type, function.return_type)
+            self.assertIs(ast._NOT_CONVERTED, function._parameters)
+
+    def test_same_results_as_eager_conversion(self):
+        for (code, return_type, parameters, specializations,
+             exportable) in self._CASES:
+            function = self._get_function(code)
+            self.assertEqual(return_type, function.return_type, code)
+            self.assertEqual(parameters, function.parameters, code)
+            self.assertEqual(specializations, function.specializations,
+                             code)
+            self.assertEqual(exportable, function.is_exportable(), code)
+
+
 class TypeConverterDeclarationToPartsTest(unittest.TestCase):
 
     def setUp(self):
@@ -508,6 +587,33 @@ class TypeConverterToTypeTest(unittest.TestCase):
                  Type('int')]
         self.assertEqual(Type('function', templated_types=types), result[0])
 
+    def test_template_with_deeply_nested_args(self):
+        depth = 2000
+        tokens = get_tokens('Foo<' * depth + 'int' + '>' * depth)
+        result = self.converter.to_type(list(tokens))
+        self.assertEqual(1, len(result))
+        for _ in range(depth):
+            self.assertEqual('Foo', result[0].name)
+            result = result[0].templated_types
+            self.assertEqual(1, len(result))
+        self.assertEqual(Type('int'), result[0])
+
+    def test_template_with_nested_args_and_trailing_name(self):
+        tokens = get_tokens('map<string, vector<pair<int, Foo*> > >::iterator')
+        result = self.converter.to_type(list(tokens))
+        self.assertEqual(1, len(result))
+        pair = Type('pair', templated_types=[Type('int'),
+                                             Type('Foo', pointer=True)])
+        types = [Type('string'), Type('vector', templated_types=[pair])]
+        self.assertEqual(Type('map::iterator', templated_types=types),
+                         result[0])
+
+    def test_template_without_closing_bracket(self):
+        tokens = get_tokens('Bar<Foo')
+        result = self.converter.to_type(list(tokens))
+        self.assertEqual(1, len(result))
+        self.assertEqual(Type('Bar'), result[0])
+
     def test_array(self):
         tokens = get_tokens('Foo[]')
         result = self.converter.to_type(list(tokens))
@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+
+"""Tests for baseline module."""
+
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import io
+import os
+import shutil
+import tempfile
+import unittest
+
+from cpp import baseline
+from cpp import report
+
+
+class FingerprintTest(unittest.TestCase):
+
+    def test_ignores_line_numbers_in_message(self):
+        self.assertEqual(
+            baseline.fingerprint('foo.h', 'duplicate-include',
+                                 "'bar.h' already #included on line 3"),
+            baseline.fingerprint('foo.h', 'duplicate-include',
+                                 "'bar.h' already #included on line 30"))
+
+    def test_differs(self):
+        fingerprints = set([
+            baseline.fingerprint('foo.h', 'static-data', "static data 'x'"),
+            baseline.fingerprint('bar.h', 'static-data', "static data 'x'"),
+            baseline.fingerprint('foo.h', 'static-data', "static data 'y'"),
+            baseline.fingerprint('foo.h', 'unused-variable',
+                                 "static data 'x'"),
+            baseline.fingerprint('foo.h', 'static-data', "static data 'x'",
+                                 1),
+        ])
+        self.assertEqual(5, len(fingerprints))
+
+    def test_same_on_windows(self):
+        self.assertEqual(
+            baseline.fingerprint('dir/foo.h', 'static-data', 'x'),
+            baseline.fingerprint('dir\\foo.h', 'static-data', 'x'))
+
+
+class BaselineFilterTest(unittest.TestCase):
+
+    def _run(self, warnings, fingerprints=frozenset()):
+        output = io.StringIO()
+        baseline_filter = baseline.BaselineFilter(report.Reporter(output),
+                                                  fingerprints)
+        for line, message in warnings:
+            baseline_filter.add('foo.h', line, 1, 'static-data', message)
+        baseline_filter.close()
+        return baseline_filter, output.getvalue()
+
+    def test_suppresses_known_warnings_after_line_shift(self):
+        known, _ = self._run([(1, 'a'), (2, 'b'), (3, 'a')])
+        self.assertEqual(3, len(known.fingerprints))
+
+        baseline_filter, output = self._run(
+            [(10, 'a'), (11, 'c'), (12, 'b'), (13, 'a'), (14, 'a')],
+            known.fingerprints)
+        self.assertEqual('foo.h:11: c\nfoo.h:14: a\n', output)
+        self.assertEqual(3, baseline_filter.suppressed)
+
+
+class BaselineFileTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.filename = os.path.join(self.directory, 'baseline.txt')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_save_and_load(self):
+        fingerprints = set([baseline.fingerprint('foo.h', 'static-data', m)
+                            for m in 'abc'])
+        baseline.save(self.filename, fingerprints)
+        self.assertEqual(fingerprints, baseline.load(self.filename))
+
+    def test_load_missing_file(self):
+        self.assertRaises(baseline.Error, baseline.load, self.filename)
+
+    def test_load_other_file(self):
+        with io.open(self.filename, 'w') as output_file:
+            output_file.write('foo.h:1: static data\n')
+        self.assertRaises(baseline.Error, baseline.load, self.filename)
+
+
+if __name__ == '__main__':
+    unittest.main()
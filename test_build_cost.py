@@ -0,0 +1,108 @@
+#!/usr/bin/env python
+
+"""Tests for build_cost module."""
+
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import io
+import unittest
+
+from cpp import build_cost
+from cpp import include_graph
+from cpp import report
+
+
+def _make_graph():
+    graph = include_graph.IncludeGraph()
+    graph.add_file('a.cc', 'x\n' * 10, checked=True)
+    graph.add_include('a.cc', 1, 'big.h', False)
+    graph.add_include('a.cc', 2, 'small.h', False)
+    graph.add_file('b.cc', 'x\n' * 20, checked=True)
+    graph.add_include('b.cc', 1, 'big.h', False)
+    graph.add_file('big.h', 'x\n' * 100)
+    graph.add_include('big.h', 1, 'small.h', False)
+    graph.add_include('big.h', 2, 'vector', True)
+    graph.add_file('small.h', 'x\n' * 5)
+    return graph
+
+
+class GetCostsTest(unittest.TestCase):
+
+    def test_get_costs(self):
+        graph = _make_graph()
+        costs = build_cost.get_costs(graph)
+        self.assertEqual((105, 2, 210), costs[graph.get_key('big.h')])
+        self.assertEqual((5, 2, 10), costs[graph.get_key('small.h')])
+        self.assertEqual((115, 1, 115), costs[graph.get_key('a.cc')])
+        self.assertEqual((0, 2, 0), costs[graph.get_key('vector', True)])
+
+    def test_paths_of_the_same_header(self):
+        graph = include_graph.IncludeGraph()
+        graph.add_file('src/a.cc', 'x\n', checked=True)
+        graph.add_include('src/a.cc', 1, 'inc/a.h', False)
+        graph.add_file('src/b.cc', 'x\n', checked=True)
+        graph.add_include('src/b.cc', 1, 'src/../inc/a.h', False)
+        graph.add_file('inc/a.h', 'x\n' * 2)
+        costs = build_cost.get_costs(graph)
+        self.assertEqual((2, 2, 4), costs[graph.get_key('src/../inc/a.h')])
+        self.assertEqual([('inc/a.h', (2, 2, 4))],
+                         build_cost.get_most_expensive(graph, costs, 10))
+
+    def test_cycle(self):
+        graph = include_graph.IncludeGraph()
+        graph.add_file('a.cc', 'x\n', checked=True)
+        graph.add_include('a.cc', 1, 'a.h', False)
+        graph.add_file('a.h', 'x\n' * 10)
+        graph.add_include('a.h', 1, 'b.h', False)
+        graph.add_file('b.h', 'x\n' * 20)
+        graph.add_include('b.h', 1, 'a.h', False)
+        costs = build_cost.get_costs(graph)
+        self.assertEqual((30, 1, 30), costs[graph.get_key('a.h')])
+        self.assertEqual((30, 1, 30), costs[graph.get_key('b.h')])
+
+    def test_print_summary(self):
+        output = io.StringIO()
+        graph = _make_graph()
+        build_cost.print_summary(output, graph, build_cost.get_costs(graph),
+                                 count=2)
+        lines = output.getvalue().splitlines()
+        self.assertEqual(3, len(lines))
+        self.assertEqual(['210', '105', '2', 'big.h'], lines[1].split())
+        self.assertEqual(['10', '5', '2', 'small.h'], lines[2].split())
+
+
+class CostRankerTest(unittest.TestCase):
+
+    def test_ranking(self):
+        output = io.StringIO()
+        ranker = build_cost.CostRanker(report.Reporter(output),
+                                       _make_graph())
+        ranker.add('a.cc', 2, 1, 'unnecessary-include',
+                   "'small.h' does not need to be #included")
+        ranker.add('a.cc', 5, 1, 'unused-variable', "unused variable 'x'")
+        ranker.add('big.h', 1, 1, 'unnecessary-include',
+                   "'small.h' does not need to be #included")
+        ranker.add('b.cc', 1, 1, 'unnecessary-include',
+                   "'big.h' does not need to be #included")
+        ranker.close()
+
+        self.assertEqual(
+            ["a.cc:5: unused variable 'x'",
+             "b.cc:1: 'big.h' does not need to be #included; "
+             "removing it saves compiling about 105 lines",
+             "big.h:1: 'small.h' does not need to be #included; "
+             "removing it saves compiling about 10 lines",
+             "a.cc:2: 'small.h' does not need to be #included; "
+             "removing it saves compiling about 5 lines"],
+            output.getvalue().splitlines())
+
+    def test_unknown_include(self):
+        ranker = build_cost.CostRanker(None, _make_graph())
+        ranker.costs = build_cost.get_costs(ranker.graph)
+        self.assertEqual(0, ranker.get_saved_lines('a.cc', 3))
+        self.assertEqual(0, ranker.get_saved_lines('c.cc', 1))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+#!/usr/bin/env python
+
+"""Tests for cache module."""
+
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import unittest
+
+from cpp import cache
+
+
+class LRUCacheTest(unittest.TestCase):
+
+    def test_unbounded(self):
+        values = cache.LRUCache()
+        for i in range(100):
+            values[i] = str(i)
+        self.assertEqual(100, len(values))
+        self.assertEqual(0, values.evictions)
+        self.assertEqual(0, values.size)
+
+    def test_get(self):
+        values = cache.LRUCache()
+        values['a'] = 1
+        self.assertEqual(1, values.get('a'))
+        self.assertIsNone(values.get('b'))
+        self.assertEqual(2, values.get('b', 2))
+        self.assertEqual((1, 2), (values.hits, values.misses))
+        self.assertIn('a', values)
+        self.assertNotIn('b', values)
+        self.assertEqual(1, values['a'])
+        self.assertEqual((1, 2), (values.hits, values.misses))
+
+    def test_max_entries(self):
+        values = cache.LRUCache(max_entries=2)
+        values['a'] = 1
+        values['b'] = 2
+        values.get('a')
+        values['c'] = 3
+        self.assertEqual([('a', 1), ('c', 3)], sorted(values.items()))
+        self.assertEqual(1, values.evictions)
+
+    def test_replace(self):
+        values = cache.LRUCache(max_entries=2, max_bytes=100, weigh=len)
+        values['a'] = 'x' * 10
+        values['a'] = 'x' * 20
+        self.assertEqual(1, len(values))
+        self.assertEqual(20, values.size)
+        self.assertEqual(0, values.evictions)
+
+    def test_max_bytes(self):
+        values = cache.LRUCache(max_bytes=100, weigh=len)
+        values['a'] = 'x' * 40
+        values['b'] = 'x' * 40
+        values.get('a')
+        values['c'] = 'x' * 40
+        self.assertEqual(['a', 'c'], sorted([k for k, _ in values.items()]))
+        self.assertEqual(80, values.size)
+
+        values['d'] = 'x' * 1000
+        self.assertEqual(['d'], [k for k, _ in values.items()])
+        self.assertEqual(1000, values.size)
+        self.assertEqual(3, values.evictions)
+
+    def test_default_weight(self):
+        values = cache.LRUCache(max_bytes=10 ** 6)
+        values['a'] = ['x' * 1000]
+        self.assertGreater(values.size, 1000)
+
+
+if __name__ == '__main__':
+    unittest.main()
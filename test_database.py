@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+
+"""Tests for database module."""
+
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+
+from cpp import database
+
+
+class DatabaseTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.filename = os.path.join(self.directory, 'results.sqlite')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def _query(self, sql):
+        connection = sqlite3.connect(self.filename)
+        try:
+            return connection.execute(sql).fetchall()
+        finally:
+            connection.close()
+
+    def test_store_run(self):
+        results = database.Database(self.filename, arguments='foo.cc')
+        results.add('foo.h', 1, 1, 'unnecessary-include',
+                    "'bar.h' does not need to be #included")
+        results.add_file('foo.cc', 0.5, 1)
+        results.add_file('bad.cc', 0.1, 0, 'parsing error')
+        results.add_include('foo.cc', 1, 'foo.h', False)
+        results.close()
+
+        self.assertEqual([(1, 'foo.cc')],
+                         self._query('SELECT id, arguments FROM runs'))
+        self.assertEqual(
+            [(1, 'foo.h', 1, 1, 'unnecessary-include',
+              "'bar.h' does not need to be #included")],
+            self._query('SELECT * FROM warnings'))
+        self.assertEqual(
+            [('bad.cc', 'parsing error'), ('foo.cc', None)],
+            self._query('SELECT filename, error FROM files ORDER BY 1'))
+        self.assertEqual([(1, 'foo.cc', 1, 'foo.h', 0)],
+                         self._query('SELECT * FROM includes'))
+
+    def test_runs_are_kept_apart(self):
+        for _ in range(2):
+            results = database.Database(self.filename)
+            results.add('foo.h', 1, 1, 'static-data', "static data 'x'")
+            results.close()
+        self.assertEqual([(1, 1), (2, 1)],
+                         self._query('SELECT run_id, COUNT(*) FROM warnings '
+                                     'GROUP BY run_id'))
+
+    def test_batches(self):
+        results = database.Database(self.filename, batch_size=2)
+        results.add('foo.h', 1, 1, 'static-data', 'a')
+        self.assertEqual([(0,)], self._query('SELECT COUNT(*) FROM warnings'))
+        results.add('foo.h', 2, 1, 'static-data', 'b')
+        self.assertEqual([(2,)], self._query('SELECT COUNT(*) FROM warnings'))
+        results.close()
+
+    def test_other_schema_version(self):
+        connection = sqlite3.connect(self.filename)
+        connection.execute('PRAGMA user_version = 1000')
+        connection.close()
+        self.assertRaises(database.Error, database.Database, self.filename)
+
+    def test_not_a_database(self):
+        with open(self.filename, 'w') as output_file:
+            output_file.write('not a database' * 100)
+        self.assertRaises(database.Error, database.Database, self.filename)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -4,32 +4,213 @@
 
 from __future__ import absolute_import
 
+import collections
+import io
+import os
+import shutil
+import tempfile
 import unittest
 
+from cpp import ast
 from cpp import find_warnings
+from cpp import limits
+from cpp import report
+from cpp import visitor
 
 
-class Tests(unittest.TestCase):
+class WarningHunterTest(unittest.TestCase):
 
-    def test_get_correct_include_filename(self):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def _write(self, name, source):
+        filename = os.path.join(self.directory, name)
+        with open(filename, 'w') as output_file:
+            output_file.write(source)
+        return filename
+
+    def test_warnings_in_primary_header_use_cached_lines(self):
+        header = self._write('foo.h', 'void a();\n\nvoid b();\n')
+        source = '#include "foo.h"\n'
+        filename = self._write('foo.cc', source)
+        ast_list = list(ast.builder_from_source(source, filename).generate())
+
+        hunter = find_warnings.WarningHunter(filename, source, ast_list,
+                                             include_paths=[])
+        ast_visitor = visitor.Visitor()
+        hunter.register(ast_visitor)
+        ast_visitor.walk(ast_list)
+        # The line numbers of the #includes are found when asked for.
+        self.assertIsNone(hunter.metrics._newlines)
+        self.assertEqual([(1, header, False)], hunter.get_include_edges())
+
+        # The header is not read again to find the line numbers.
+        self._write('foo.h', '\n' * 10)
+        self.assertEqual(2, hunter.finish(report.Reporter(io.StringIO())))
         self.assertEqual(
-            'FOO.h',
-            find_warnings.get_correct_include_filename(
-                'foo.h',
-                ['FOO.h', 'apple.h']))
+            [(header, 1, "'a' declared but not defined"),
+             (header, 3, "'b' declared but not defined")],
+            sorted(hunter.warnings))
+
+    def test_warnings_in_header_without_newlines_read_it_once(self):
+        header = self._write('foo.h', 'void a();\n\nvoid b();\n')
+        source = '#include "foo.h"\n'
+        filename = self._write('foo.cc', source)
+        ast_list = list(ast.builder_from_source(source, filename).generate())
+
+        hunter = find_warnings.WarningHunter(filename, source, ast_list,
+                                             include_paths=[])
+        ast_visitor = visitor.Visitor()
+        hunter.register(ast_visitor)
+        ast_visitor.walk(ast_list)
+        self.assertIsNotNone(
+            find_warnings.WarningHunter._module_cache[header].newlines)
 
-    def test_get_correct_include_filename_without_match(self):
+        self._write('foo.h', '\n' * 20)
+        find_warnings.WarningHunter._module_cache[header].newlines = None
+        self.assertEqual(2, hunter.finish(report.Reporter(io.StringIO())))
         self.assertEqual(
-            None,
-            find_warnings.get_correct_include_filename(
-                'foo.h',
-                ['f.h', 'apple.h']))
+            [(header, 1, "'a' declared but not defined"),
+             (header, 12, "'b' declared but not defined")],
+            sorted(hunter.warnings))
+        # The newlines read are kept for the next warnings.
+        module = find_warnings.WarningHunter._module_cache[header]
+        self.assertEqual(20, len(module.newlines))
+
+    def test_warnings_in_checked_primary_header_do_not_read_it(self):
+        os.mkdir(os.path.join(self.directory, 'include'))
+        os.mkdir(os.path.join(self.directory, 'src'))
+        header_source = ''.join(['void f{}();\n'.format(i)
+                                 for i in range(200)])
+        header = self._write(os.path.join('include', 'foo.h'), header_source)
+        source = '#include "foo.h"\n'
+        filename = self._write(os.path.join('src', 'foo.cc'), source)
+        include_paths = [os.path.join(self.directory, 'include')]
+
+        for name, contents in [(header, header_source), (filename, source)]:
+            ast_list = list(ast.builder_from_source(contents,
+                                                    name).generate())
+            hunter = find_warnings.WarningHunter(name, contents, ast_list,
+                                                 include_paths=include_paths)
+            ast_visitor = visitor.Visitor()
+            hunter.register(ast_visitor)
+            ast_visitor.walk(ast_list)
+            reads = collections.Counter()
+            read_file = find_warnings.utils.read_file
+
+            def _read_file(path, *args):
+                reads[path] += 1
+                return read_file(path, *args)
+
+            find_warnings.utils.read_file = _read_file
+            try:
+                hunter.finish(report.Reporter(io.StringIO()))
+            finally:
+                find_warnings.utils.read_file = read_file
+
+        self.assertEqual(200, len(hunter.warnings))
+        self.assertIn((header, 200, "'f199' declared but not defined"),
+                      hunter.warnings)
+        self.assertEqual(0, reads[header])
+
+    def test_function_found_in_first_exporting_header(self):
+        primary = self._write('foo.h', 'void a();\n')
+        first = self._write('first.h', 'void b();\n')
+        self._write('second.h', 'void b();\n')
+        source = ('#include "foo.h"\n#include "first.h"\n'
+                  '#include "second.h"\nvoid a() {}\nvoid b() {}\n')
+        filename = self._write('foo.cc', source)
+        ast_list = list(ast.builder_from_source(source, filename).generate())
 
+        hunter = find_warnings.WarningHunter(filename, source, ast_list,
+                                             include_paths=[])
+        hunter.find_warnings()
+        self.assertIn(
+            (filename, 5, "expected to find 'b' in '{}', but found in "
+                          "'{}'".format(primary, first)),
+            hunter.warnings)
+
+    def test_symbol_lookups_are_remembered(self):
+        self._write('foo.h', 'class Foo {};\n')
+        self._write('bar.h', 'class Bar {};\n')
+        source = ('#include "foo.h"\n#include "bar.h"\n'
+                  'inline void f() {\n'
+                  '  Foo a; Foo b; Missing c; Missing d;\n'
+                  '  x::y::Foo e; z::Missing g;\n'
+                  '}\n')
+        filename = self._write('use.h', source)
+        ast_list = list(ast.builder_from_source(source, filename).generate())
+
+        hunter = find_warnings.WarningHunter(filename, source, ast_list,
+                                             include_paths=[])
+        find_symbol = hunter.symbol_table.find_symbol
+        lookups = collections.Counter()
+
+        def _find_symbol(name, namespace_stack):
+            lookups[name] += 1
+            return find_symbol(name, namespace_stack)
+
+        hunter.symbol_table.find_symbol = _find_symbol
+        get_namespace = hunter.symbol_table.get_namespace
+        namespaces = collections.Counter()
+
+        def _get_namespace(name_seq):
+            namespaces[tuple(name_seq)] += 1
+            return get_namespace(name_seq)
+
+        hunter.symbol_table.get_namespace = _get_namespace
+        hunter.find_warnings()
+
+        # x, y and z are not namespaces, so they do not change the lookup.
+        self.assertEqual(1, lookups['Foo'])
+        self.assertEqual(1, lookups['Missing'])
+        self.assertEqual(1, max(lookups.values()))
+        # Each namespace is only reduced once, and the names after the
+        # longest namespace are left out first.
+        self.assertEqual({(): 1}, dict(namespaces))
         self.assertEqual(
-            None,
-            find_warnings.get_correct_include_filename(
-                'foo.h',
-                []))
+            [(filename, 2, "'bar.h' does not need to be #included")],
+            sorted(hunter.warnings))
+
+    def test_header_over_token_limit_is_not_parsed(self):
+        header = self._write('big.h', 'int a; int b; int c;\n')
+        source = '#include "big.h"\n'
+        filename = self._write('big.cc', source)
+        ast_list = list(ast.builder_from_source(source, filename).generate())
+
+        hunter = find_warnings.WarningHunter(
+            filename, source, ast_list, include_paths=[],
+            file_limits=limits.Limits(max_tokens=5))
+        hunter.find_warnings()
+        self.assertIsNone(
+            find_warnings.WarningHunter._module_cache[header].ast_list)
+
+    def test_header_over_time_limit_is_not_parsed_again(self):
+        header = self._write('big.h', 'int a; int b; int c;\n')
+        source = '#include "big.h"\n'
+        filename = self._write('big.cc', source)
+        ast_list = list(ast.builder_from_source(source, filename).generate())
+
+        hunter = find_warnings.WarningHunter(
+            filename, source, ast_list, include_paths=[],
+            file_limits=limits.Limits(max_seconds=-1))
+        with self.assertRaises(limits.TimeLimitExceeded) as context:
+            hunter.find_warnings()
+        self.assertIn("parsing '{}'".format(header),
+                      str(context.exception))
+        module = find_warnings.WarningHunter._module_cache[header]
+        self.assertIsNone(module.ast_list)
+
+        # The other files that #include the header do not parse it again.
+        hunter = find_warnings.WarningHunter(
+            filename, source, ast_list, include_paths=[],
+            file_limits=limits.Limits(max_seconds=-1))
+        hunter.find_warnings()
+        self.assertIs(module,
+                      find_warnings.WarningHunter._module_cache[header])
 
 
 if __name__ == '__main__':
@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+
+"""Tests for headers module."""
+
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from cpp import headers
+
+
+class ResolverTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        for name in ['a/foo.h', 'b/foo.h', 'b/sub/bar.h']:
+            self._write(name)
+        os.mkdir(os.path.join(self.directory, 'a', 'dir.h'))
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def _write(self, name):
+        filename = os.path.join(self.directory, name)
+        if not os.path.isdir(os.path.dirname(filename)):
+            os.makedirs(os.path.dirname(filename))
+        with open(filename, 'w'):
+            pass
+
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    def test_find(self):
+        resolver = headers.Resolver()
+        include_paths = [self._path('a'), self._path('b')]
+        self.assertEqual(self._path('a/foo.h'),
+                         resolver.find('foo.h', include_paths))
+        self.assertEqual(os.path.join(self._path('b'), 'sub/bar.h'),
+                         resolver.find('sub/bar.h', include_paths))
+        self.assertEqual(self._path('b/foo.h'),
+                         resolver.find('foo.h', include_paths[1:]))
+        self.assertIsNone(resolver.find('baz.h', include_paths))
+        self.assertIsNone(resolver.find('foo.h', [self._path('none')]))
+
+    def test_directory_is_not_found(self):
+        resolver = headers.Resolver()
+        self.assertIsNone(resolver.find('dir.h', [self._path('a')]))
+
+    def test_results_are_cached(self):
+        resolver = headers.Resolver()
+        include_paths = [self._path('a'), self._path('b')]
+        found = resolver.find('foo.h', include_paths)
+        os.remove(self._path('a/foo.h'))
+        self.assertEqual(found, resolver.find('foo.h', include_paths))
+
+    def test_directories_are_listed_once(self):
+        resolver = headers.Resolver()
+        listdir = os.listdir
+        listed = []
+
+        def fake_listdir(directory):
+            listed.append(directory)
+            return listdir(directory)
+
+        headers.os.listdir = fake_listdir
+        try:
+            resolver.find('foo.h', [self._path('a')])
+            resolver.find('bar.h', [self._path('a')])
+            resolver.get_correct_case(self._path('a/FOO.h'))
+        finally:
+            headers.os.listdir = listdir
+        self.assertEqual([self._path('a')], listed)
+
+    def test_changed_directories_are_listed_again(self):
+        resolver = headers.Resolver()
+        self.assertIsNone(resolver.find('bar.h', [self._path('a')]))
+        self._write('a/bar.h')
+        mtime = os.stat(self._path('a')).st_mtime + 10
+        os.utime(self._path('a'), (mtime, mtime))
+        self.assertEqual(self._path('a/bar.h'),
+                         resolver.find('bar.h', [self._path('none'),
+                                                 self._path('a')]))
+
+    def test_get_correct_case(self):
+        resolver = headers.Resolver()
+        self.assertEqual('foo.h',
+                         resolver.get_correct_case(self._path('a/FOO.h')))
+        self.assertIsNone(resolver.get_correct_case(self._path('a/foo.h')))
+        self.assertIsNone(resolver.get_correct_case(self._path('a/baz.h')))
+        self.assertIsNone(resolver.get_correct_case(self._path('none/a.h')))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,242 @@
+#!/usr/bin/env python
+
+"""Tests for include_graph module."""
+
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import io
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from cpp import headers
+from cpp import include_graph
+
+
+class GetFormatTest(unittest.TestCase):
+
+    def test_get_format(self):
+        self.assertEqual('dot', include_graph.get_format('out.dot'))
+        self.assertEqual('dot', include_graph.get_format('OUT.DOT'))
+        self.assertEqual('json', include_graph.get_format('out.json'))
+        self.assertEqual('json', include_graph.get_format('out'))
+
+
+class ScanIncludesTest(unittest.TestCase):
+
+    def test_scan_includes(self):
+        source = ('#include "foo.h"\n'
+                  'class Foo { int x; };\n'
+                  '#include <vector>\n'
+                  '#if 0\n'
+                  '#include "bar.h"\n'
+                  '#endif\n')
+        includes = include_graph.scan_includes(source, 'foo.cc')
+        self.assertEqual([('foo.h', False), ('vector', True)],
+                         [(i.filename, i.system) for i in includes])
+
+    def test_scan_includes_with_token_error(self):
+        source = ('#include "foo.h"\n'
+                  'int x = @;\n'
+                  '#define A \\\n'
+                  '  @\n'
+                  '  #  include <vector>\n')
+        includes = include_graph.scan_includes(source, 'foo.cc')
+        self.assertEqual([('foo.h', False, 0), ('vector', True, 46)],
+                         [(i.filename, i.system, i.start) for i in includes])
+
+
+def _get_edges(graph, filename):
+    """Return the edges of filename, with the names of the files."""
+    return [(line, graph.nodes[included].filename, system)
+            for line, included, system
+            in graph.edges[graph.get_key(filename)]]
+
+
+def _get_closure(graph, filename):
+    """Return the names of the files in the closure of filename."""
+    closure = graph.get_closures()[graph.get_key(filename)]
+    return set([graph.nodes[key].filename for key in closure])
+
+
+class IncludeGraphTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def _write(self, name, source):
+        filename = os.path.join(self.directory, name)
+        with io.open(filename, 'w', encoding='utf-8') as f:
+            f.write(source)
+        return filename
+
+    def test_add_file(self):
+        graph = include_graph.IncludeGraph()
+        graph.add_file('foo.cc', 'a\nb\n', checked=True)
+        graph.add_include('foo.cc', 1, 'foo.h', False)
+        graph.add_include('foo.cc', 2, 'vector', True)
+
+        self.assertEqual(['foo.cc', 'foo.h', 'vector'],
+                         [node.filename for node in graph.nodes.values()])
+        node = graph.nodes[graph.get_key('foo.cc')]
+        self.assertEqual((2, 4, True, True),
+                         (node.lines, node.bytes, node.checked, node.found))
+        self.assertFalse(graph.nodes[graph.get_key('foo.h')].found)
+        self.assertTrue(graph.nodes[graph.get_key('vector', True)].system)
+        self.assertEqual([(1, 'foo.h', False), (2, 'vector', True)],
+                         _get_edges(graph, 'foo.cc'))
+
+    def test_paths_of_the_same_file(self):
+        graph = include_graph.IncludeGraph()
+        graph.add_include('src/a.cc', 1, 'inc/a.h', False)
+        graph.add_include('src/b.cc', 1, 'src/../inc/a.h', False)
+        graph.add_include('./inc/a.h', 1, 'inc/b.h', False)
+
+        self.assertEqual(['src/a.cc', 'inc/a.h', 'src/b.cc', 'inc/b.h'],
+                         [node.filename for node in graph.nodes.values()])
+        self.assertEqual(graph.get_key('inc/a.h'),
+                         graph.get_key('src/../inc/a.h'))
+        self.assertEqual(set(['src/b.cc', 'inc/a.h', 'inc/b.h']),
+                         _get_closure(graph, 'src/b.cc'))
+        self.assertEqual([{'source': 'src/b.cc', 'target': 'inc/a.h',
+                           'line': 1, 'system': False}],
+                         [edge for edge in graph.to_dict()['edges']
+                          if edge['source'] == 'src/b.cc'])
+
+    def test_complete(self):
+        foo_h = self._write('foo.h', '#pragma once\n#include "bar.h"\n')
+        bar_h = self._write('bar.h', '#include <map>\n#include "baz.h"\n')
+        graph = include_graph.IncludeGraph()
+        graph.add_file('foo.cc', '#include "foo.h"\n', checked=True)
+        graph.add_include('foo.cc', 1, foo_h, False)
+        graph.complete([], headers.Resolver())
+
+        self.assertEqual([(2, bar_h, False)], _get_edges(graph, foo_h))
+        self.assertEqual([(1, 'map', True), (2, 'baz.h', False)],
+                         _get_edges(graph, bar_h))
+        self.assertEqual(2, graph.nodes[graph.get_key(bar_h)].lines)
+        self.assertFalse(graph.nodes[graph.get_key(bar_h)].checked)
+        self.assertFalse(graph.nodes[graph.get_key('baz.h')].found)
+        self.assertNotIn(graph.get_key('map', True), graph.edges)
+
+    def test_add_scanned_file(self):
+        bar_h = self._write('bar.h', '')
+        source = '#include "bar.h"\n@\n#include <map>\n'
+        foo_h = self._write('foo.h', source)
+        graph = include_graph.IncludeGraph()
+        self.assertEqual([bar_h], graph.add_scanned_file(
+            foo_h, source, [], headers.Resolver(), checked=True))
+
+        self.assertEqual([(1, bar_h, False), (3, 'map', True)],
+                         _get_edges(graph, foo_h))
+        self.assertTrue(graph.nodes[graph.get_key(foo_h)].checked)
+        self.assertNotIn(graph.get_key(bar_h), graph.edges)
+
+    def test_find_cycles(self):
+        graph = include_graph.IncludeGraph()
+        graph.add_include('a.h', 1, 'b.h', False)
+        graph.add_include('b.h', 1, 'c.h', False)
+        graph.add_include('c.h', 1, 'a.h', False)
+        graph.add_include('c.h', 2, 'd.h', False)
+        graph.add_include('d.h', 1, 'd.h', False)
+        graph.add_include('e.h', 1, 'a.h', False)
+        self.assertEqual([['a.h', 'b.h', 'c.h'], ['d.h']],
+                         sorted(graph.find_cycles()))
+
+    def test_no_cycles(self):
+        graph = include_graph.IncludeGraph()
+        graph.add_include('a.h', 1, 'b.h', False)
+        graph.add_include('a.h', 2, 'c.h', False)
+        graph.add_include('b.h', 1, 'c.h', False)
+        self.assertEqual([], graph.find_cycles())
+
+    def test_get_closures(self):
+        graph = include_graph.IncludeGraph()
+        graph.add_include('a.h', 1, 'b.h', False)
+        graph.add_include('b.h', 1, 'c.h', False)
+        graph.add_include('c.h', 1, 'b.h', False)
+        graph.add_include('c.h', 2, 'd.h', False)
+        closures = graph.get_closures()
+        self.assertEqual(set(['a.h', 'b.h', 'c.h', 'd.h']),
+                         _get_closure(graph, 'a.h'))
+        self.assertEqual(set(['b.h', 'c.h', 'd.h']),
+                         _get_closure(graph, 'b.h'))
+        self.assertIs(closures[graph.get_key('b.h')],
+                      closures[graph.get_key('c.h')])
+        self.assertEqual(set(['d.h']), _get_closure(graph, 'd.h'))
+
+    def test_get_reachable(self):
+        graph = include_graph.IncludeGraph()
+        graph.add_include('a.cc', 1, 'dir/b.h', False)
+        graph.add_include('dir/b.h', 1, 'dir/../c.h', False)
+        graph.add_include('c.h', 1, 'd.h', False)
+        graph.add_include('d.h', 1, 'c.h', False)
+        graph.add_include('e.h', 1, 'f.h', False)
+        self.assertEqual(
+            set([graph.get_key(f) for f in ['a.cc', 'dir/b.h', 'c.h', 'd.h']]),
+            graph.get_reachable(['./a.cc']))
+        self.assertEqual(set(), graph.get_reachable([]))
+
+    def test_get_reachable_with_absolute_include_path(self):
+        # Like cppclean -I /abs/inc --never-included src inc.
+        os.mkdir(os.path.join(self.directory, 'inc'))
+        header = os.path.relpath(self._write(os.path.join('inc', 'a.h'), ''))
+        source = os.path.relpath(self._write('a.cc', '#include "a.h"\n'))
+        included = headers.Resolver().find(
+            'a.h', [os.path.dirname(source),
+                    os.path.join(self.directory, 'inc')])
+        self.assertTrue(os.path.isabs(included))
+
+        graph = include_graph.IncludeGraph()
+        graph.add_file(source, '#include "a.h"\n', checked=True)
+        graph.add_include(source, 1, included, False)
+        graph.add_file(header, '', checked=True)
+        self.assertEqual(2, len(graph.nodes))
+        self.assertIn(graph.get_key(header), graph.get_reachable([source]))
+
+    def test_write_json(self):
+        graph = include_graph.IncludeGraph()
+        graph.add_file('foo.cc', 'x\n', checked=True)
+        graph.add_include('foo.cc', 1, 'foo.h', False)
+        output = io.StringIO()
+        graph.write(output, 'json')
+
+        data = json.loads(output.getvalue())
+        self.assertEqual(['foo.cc', 'foo.h'],
+                         [node['id'] for node in data['nodes']])
+        self.assertEqual(1, data['nodes'][0]['lines'])
+        self.assertEqual([{'source': 'foo.cc', 'target': 'foo.h',
+                           'line': 1, 'system': False}], data['edges'])
+        self.assertEqual([], data['cycles'])
+
+    def test_write_dot(self):
+        graph = include_graph.IncludeGraph()
+        graph.add_file('a.h', 'x\n')
+        graph.add_include('a.h', 1, 'b.h', False)
+        graph.add_include('b.h', 1, 'a.h', False)
+        graph.add_include('a.h', 2, 'vector', True)
+        output = io.StringIO()
+        graph.write(output, 'dot')
+
+        lines = output.getvalue().splitlines()
+        self.assertEqual('digraph includes {', lines[0])
+        self.assertIn('  "a.h" [lines=1, bytes=2];', lines)
+        self.assertIn('  "b.h" [style=dashed];', lines)
+        self.assertIn('  "vector" [shape=box];', lines)
+        self.assertIn('  "a.h" -> "b.h" [color=red];', lines)
+        self.assertIn('  "b.h" -> "a.h" [color=red];', lines)
+        self.assertIn('  "a.h" -> "vector";', lines)
+
+    def test_unknown_format(self):
+        graph = include_graph.IncludeGraph()
+        self.assertRaises(ValueError, graph.write, io.StringIO(), 'xml')
+
+
+if __name__ == '__main__':
+    unittest.main()
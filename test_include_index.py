@@ -0,0 +1,112 @@
+#!/usr/bin/env python
+
+"""Tests for include_index module."""
+
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+
+from cpp import include_graph
+from cpp import include_index
+
+
+def _make_graph(includes, units=()):
+    """Return a graph of the files of includes, a map file: #includes."""
+    graph = include_graph.IncludeGraph()
+    for filename, included in includes.items():
+        graph.add_file(filename, '', checked=filename in units)
+        for line, name in enumerate(included):
+            graph.add_include(filename, line + 1, name, False)
+    return graph
+
+
+def _paths(*filenames):
+    return [include_graph.get_canonical_path(f) for f in filenames]
+
+
+class IncludeIndexTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.filename = os.path.join(self.directory, 'index.sqlite')
+        self.index = include_index.IncludeIndex(self.filename)
+        self.index.update(_make_graph({'a.cc': ['a.h', 'c.h'],
+                                       'b.cc': ['b.h'],
+                                       'a.h': ['c.h'],
+                                       'b.h': ['c.h', 'd.h'],
+                                       'c.h': [],
+                                       'd.h': []},
+                                      units=['a.cc', 'b.cc']))
+
+    def tearDown(self):
+        self.index.close()
+        shutil.rmtree(self.directory)
+
+    def test_who_includes(self):
+        self.assertEqual(_paths('a.cc', 'b.cc'),
+                         self.index.who_includes('c.h'))
+        self.assertEqual(_paths('a.cc'), self.index.who_includes('a.h'))
+        self.assertEqual(_paths('b.cc'), self.index.who_includes('./d.h'))
+        self.assertEqual(_paths('b.cc'),
+                         self.index.who_includes(os.path.abspath('d.h')))
+        self.assertEqual(_paths('a.cc'), self.index.who_includes('a.cc'))
+        self.assertEqual([], self.index.who_includes('unknown.h'))
+
+    def test_persisted(self):
+        self.index.close()
+        self.index = include_index.IncludeIndex(self.filename)
+        self.assertEqual(_paths('a.cc', 'b.cc'),
+                         self.index.who_includes('c.h'))
+
+    def test_update_unchanged(self):
+        self.assertEqual(0, self.index.update(_make_graph({'a.h': ['c.h']})))
+
+    def test_update_with_other_paths(self):
+        self.assertEqual(0, self.index.update(
+            _make_graph({'./a.h': ['x/../c.h']})))
+        self.assertEqual(
+            0, self.index.update(_make_graph({os.path.abspath('b.h'):
+                                              ['c.h', './d.h']})))
+
+    def test_update_header(self):
+        self.assertEqual(1, self.index.update(_make_graph({'a.h': ['d.h']})))
+        self.assertEqual(_paths('a.cc', 'b.cc'),
+                         self.index.who_includes('d.h'))
+        self.assertEqual(_paths('a.cc', 'b.cc'),
+                         self.index.who_includes('c.h'))
+
+        self.assertEqual(2, self.index.update(_make_graph({'d.h': ['e.h']})))
+        self.assertEqual(_paths('a.cc', 'b.cc'),
+                         self.index.who_includes('e.h'))
+
+    def test_update_unit(self):
+        self.assertEqual(1, self.index.update(
+            _make_graph({'a.cc': ['a.h']}, units=['a.cc'])))
+        self.assertEqual(_paths('a.cc', 'b.cc'),
+                         self.index.who_includes('c.h'))
+
+        self.assertEqual(1, self.index.update(
+            _make_graph({'c.cc': ['d.h']}, units=['c.cc'])))
+        self.assertEqual(_paths('b.cc', 'c.cc'),
+                         self.index.who_includes('d.h'))
+
+    def test_cycle(self):
+        self.index.update(_make_graph({'c.h': ['a.h']}))
+        self.assertEqual(_paths('a.cc', 'b.cc'),
+                         self.index.who_includes('a.h'))
+
+    def test_unsupported_version(self):
+        connection = sqlite3.connect(self.filename)
+        connection.execute('PRAGMA user_version = 99')
+        connection.close()
+        self.assertRaises(include_index.Error,
+                          include_index.IncludeIndex, self.filename)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+
+"""Tests for limits module."""
+
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import unittest
+
+from cpp import ast
+from cpp import limits
+from cpp import tokenize
+
+
+class LimitsTest(unittest.TestCase):
+
+    def test_no_limits(self):
+        file_limits = limits.Limits()
+        file_limits.check_time()
+        file_limits.check_tokens(10 ** 9)
+
+    def test_max_tokens(self):
+        file_limits = limits.Limits(max_tokens=3)
+        file_limits.check_tokens(3)
+        self.assertRaises(limits.TokenLimitExceeded,
+                          file_limits.check_tokens, 4)
+
+    def test_max_seconds(self):
+        file_limits = limits.Limits(max_seconds=60)
+        file_limits.check_time()
+        file_limits.deadline -= 61
+        self.assertRaises(limits.TimeLimitExceeded, file_limits.check_time)
+        self.assertRaises(limits.TimeLimitExceeded,
+                          file_limits.check_tokens, 1)
+
+    def test_tokenize(self):
+        source = 'int a; int b;'
+        self.assertEqual(
+            6, len(list(tokenize.get_tokens(source, limits.Limits(None, 6)))))
+        self.assertRaises(
+            limits.TokenLimitExceeded,
+            list, tokenize.get_tokens(source, limits.Limits(None, 5)))
+
+    def test_tokenize_skipped_tokens(self):
+        source = '#if 0\nint a; int b;\n#endif\n'
+        self.assertRaises(
+            limits.TokenLimitExceeded,
+            list, tokenize.get_tokens(source, limits.Limits(None, 5)))
+
+    def test_parse(self):
+        file_limits = limits.Limits(max_seconds=60)
+        file_limits.deadline -= 61
+        builder = ast.ASTBuilder(iter(list(tokenize.get_tokens('int a;'))),
+                                 'foo.h', limits=file_limits)
+        self.assertRaises(limits.TimeLimitExceeded, list, builder.generate())
+
+    def test_parse_class_body(self):
+        source = 'class Foo { int a; int b; };'
+        builder = ast.builder_from_source(source, 'foo.h',
+                                          limits=limits.Limits(None, 100))
+        self.assertEqual(1, len(list(builder.generate())))
+        builder = ast.builder_from_source(source, 'foo.h',
+                                          limits=limits.Limits(None, 10))
+        self.assertRaises(limits.TokenLimitExceeded, list, builder.generate())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python
+
+"""Tests for memory module."""
+
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import io
+import unittest
+
+from cpp import cache
+from cpp import memory
+
+
+class _Node(object):
+
+    def __init__(self, name, children=()):
+        self.name = name
+        self.children = list(children)
+
+
+class _SlotsNode(object):
+
+    __slots__ = ('name', 'unset')
+
+    def __init__(self, name):
+        self.name = name
+
+
+class GetSizeTest(unittest.TestCase):
+
+    def test_get_size(self):
+        leaf = _Node('leaf')
+        self.assertGreater(memory.get_size(_Node('root', [leaf])),
+                           memory.get_size(leaf))
+
+    def test_shared_objects_counted_once(self):
+        leaf = _Node('x' * 1000)
+        seen = set()
+        first = memory.get_size(_Node('a', [leaf]), seen)
+        second = memory.get_size(_Node('b', [leaf]), seen)
+        self.assertGreater(first, 1000)
+        self.assertLess(second, 1000)
+
+    def test_slots(self):
+        self.assertGreater(memory.get_size(_SlotsNode('x' * 1000)), 1000)
+
+    def test_cycle(self):
+        node = _Node('a')
+        node.children.append(node)
+        self.assertGreater(memory.get_size(node), 0)
+
+
+class FormatSizeTest(unittest.TestCase):
+
+    def test_format_size(self):
+        self.assertEqual('12.0 B', memory.format_size(12))
+        self.assertEqual('1.5 KiB', memory.format_size(1536))
+        self.assertEqual('3.0 MiB', memory.format_size(3 * 1024 * 1024))
+
+
+@unittest.skipIf(memory.tracemalloc is None, 'requires tracemalloc')
+class MemoryReportTest(unittest.TestCase):
+
+    def test_measure(self):
+        memory_report = memory.MemoryReport()
+        kept = []
+        with memory_report.measure('big.cc'):
+            kept.append(bytearray(1000000))
+        with memory_report.measure('small.cc'):
+            bytearray(1000)
+
+        self.assertEqual(['big.cc', 'small.cc'],
+                         [f[0] for f in memory_report.get_largest_files(2)])
+        _, peak, retained = memory_report.files[0]
+        self.assertGreaterEqual(peak, 1000000)
+        self.assertGreaterEqual(retained, 1000000)
+        _, peak, retained = memory_report.files[1]
+        self.assertLess(retained, 1000)
+
+    def test_print_summary(self):
+        memory_report = memory.MemoryReport()
+        with memory_report.measure('foo.cc'):
+            pass
+        output = io.StringIO()
+        module_cache = cache.LRUCache()
+        module_cache['small.h'] = _Node('a')
+        module_cache['large.h'] = _Node('b' * 10000)
+        module_cache.get('large.h')
+        memory_report.print_summary(output, module_cache)
+        lines = output.getvalue().splitlines()
+        self.assertTrue(lines[1].endswith('foo.cc'))
+        self.assertIn('module cache: 2 modules', output.getvalue())
+        self.assertIn('module cache: 1 hits, 0 misses, 0 evictions',
+                      output.getvalue())
+        largest = lines.index('largest cached modules:')
+        self.assertTrue(lines[largest + 1].endswith('large.h'))
+        self.assertTrue(lines[largest + 2].endswith('small.h'))
+
+
+class DisabledMemoryReportTest(unittest.TestCase):
+
+    def test_disabled(self):
+        memory_report = memory.MemoryReport(enabled=False)
+        with memory_report.measure('foo.cc'):
+            pass
+        self.assertEqual([], memory_report.files)
+
+    @unittest.skipIf(memory.tracemalloc is not None, 'has tracemalloc')
+    def test_unavailable(self):
+        self.assertRaises(memory.Error, memory.MemoryReport)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+#!/usr/bin/env python
+
+"""Tests for metrics module."""
+
+from __future__ import absolute_import
+
+import unittest
+
+from cpp import metrics
+
+
+SOURCE = 'int x;\n\nclass Foo {\n  int y;\n};'
+
+
+class MetricsTest(unittest.TestCase):
+
+    def test_get_line_number(self):
+        m = metrics.Metrics(SOURCE)
+        for index in range(len(SOURCE) + 1):
+            self.assertEqual(1 + SOURCE.count('\n', 0, index),
+                             m.get_line_number(index))
+
+    def test_get_line_number_without_newline(self):
+        m = metrics.Metrics('int x;')
+        self.assertEqual(1, m.get_line_number(0))
+        self.assertEqual(1, m.get_line_number(5))
+
+    def test_get_line_number_of_empty_source(self):
+        self.assertEqual(1, metrics.Metrics('').get_line_number(0))
+
+    def test_get_line_numbers(self):
+        m = metrics.Metrics(SOURCE)
+        self.assertEqual([5, 1, 4, 3],
+                         m.get_line_numbers([SOURCE.index('}'), 0,
+                                             SOURCE.index('y'),
+                                             SOURCE.index('Foo')]))
+        self.assertEqual([], m.get_line_numbers([]))
+
+    def test_no_index_without_lookups(self):
+        m = metrics.Metrics(SOURCE)
+        self.assertEqual([], m.get_line_numbers([]))
+        self.assertIsNone(m._newlines)
+
+    def test_get_line_number_with_crlf(self):
+        source = 'a\r\nb\r\n\r\nc'
+        m = metrics.Metrics(source)
+        self.assertEqual([1, 2, 4],
+                         m.get_line_numbers([0, source.index('b'),
+                                             source.index('c')]))
+
+    def test_get_column(self):
+        m = metrics.Metrics(SOURCE)
+        self.assertEqual(1, m.get_column(0))
+        self.assertEqual(5, m.get_column(SOURCE.index('x')))
+        self.assertEqual(1, m.get_column(SOURCE.index('\n\n') + 1))
+        self.assertEqual(7, m.get_column(SOURCE.index('Foo')))
+        self.assertEqual(7, m.get_column(SOURCE.index('y')))
+
+
+if __name__ == '__main__':
+    unittest.main()
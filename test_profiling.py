@@ -0,0 +1,85 @@
+#!/usr/bin/env python
+
+"""Tests for profiling module."""
+
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import os
+import pstats
+import shutil
+import tempfile
+import unittest
+
+from cpp import profiling
+
+
+def _work():
+    return sum(range(100))
+
+
+class ProfilerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_profile(self):
+        profiler = profiling.Profiler(os.path.join(self.directory, 'out'),
+                                      '*.cc')
+        for filename in ['src/foo.cc', 'src/foo.h', 'src/bar.cc']:
+            with profiler.profile(filename):
+                _work()
+        profiler.close()
+
+        self.assertEqual(
+            sorted([profiling.AGGREGATE_NAME,
+                    profiling.get_profile_name('src/foo.cc'),
+                    profiling.get_profile_name('src/bar.cc')]),
+            sorted(os.listdir(os.path.join(self.directory, 'out'))))
+
+        aggregate = pstats.Stats(os.path.join(self.directory, 'out',
+                                              profiling.AGGREGATE_NAME))
+        calls = [value[1] for key, value in aggregate.stats.items()
+                 if key[2] == '_work']
+        self.assertEqual([2], calls)
+
+    def test_profile_names_are_unique(self):
+        profiler = profiling.Profiler(self.directory)
+        for filename in ['a/b.cc', 'a_b.cc', 'a/b.cc']:
+            with profiler.profile(filename):
+                _work()
+        profiler.close()
+
+        self.assertEqual(2, len(profiler.profiles))
+        self.assertTrue(profiling.get_profile_name('a/b.cc').startswith(
+            'a_b.cc-'))
+        aggregate = pstats.Stats(os.path.join(self.directory,
+                                              profiling.AGGREGATE_NAME))
+        calls = [value[1] for key, value in aggregate.stats.items()
+                 if key[2] == '_work']
+        self.assertEqual([2], calls)
+
+    def test_profile_on_exception(self):
+        profiler = profiling.Profiler(self.directory)
+
+        def fail():
+            with profiler.profile('foo.cc'):
+                raise ValueError()
+
+        self.assertRaises(ValueError, fail)
+        self.assertEqual(1, len(profiler.profiles))
+
+    def test_disabled(self):
+        profiler = profiling.Profiler(None)
+        self.assertFalse(profiler.matches('foo.cc'))
+        with profiler.profile('foo.cc'):
+            _work()
+        profiler.close()
+        self.assertEqual([], profiler.profiles)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+
+"""Tests for report module."""
+
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import io
+import json
+import unittest
+
+from cpp import report
+
+
+class ReporterTest(unittest.TestCase):
+
+    def _report(self, output_format, batch_size=1000):
+        output = io.StringIO()
+        reporter = report.Reporter(output, output_format=output_format,
+                                   batch_size=batch_size)
+        reporter.add('foo.h', 3, 7, 'static-data', "static data 'x'")
+        reporter.add('foo.cc', 0, 0, 'missing-primary-include',
+                     "should #include header file 'foo.h'")
+        reporter.close()
+        self.assertEqual(2, reporter.count)
+        return output.getvalue()
+
+    def test_text(self):
+        self.assertEqual(
+            "foo.h:3: static data 'x'\n"
+            "foo.cc: should #include header file 'foo.h'\n",
+            self._report('text'))
+
+    def test_jsonl(self):
+        lines = self._report('jsonl').splitlines()
+        self.assertEqual(2, len(lines))
+        self.assertEqual({'filename': 'foo.h',
+                          'line': 3,
+                          'column': 7,
+                          'check': 'static-data',
+                          'message': "static data 'x'"},
+                         json.loads(lines[0]))
+
+    def test_sarif(self):
+        log = json.loads(self._report('sarif'))
+        self.assertEqual('2.1.0', log['version'])
+        run = log['runs'][0]
+        self.assertEqual(['missing-primary-include', 'static-data'],
+                         [r['id'] for r in run['tool']['driver']['rules']])
+        results = run['results']
+        self.assertEqual(['static-data', 'missing-primary-include'],
+                         [r['ruleId'] for r in results])
+        self.assertEqual(
+            {'artifactLocation': {'uri': 'foo.h'},
+             'region': {'startLine': 3, 'startColumn': 7}},
+            results[0]['locations'][0]['physicalLocation'])
+        self.assertNotIn('region',
+                         results[1]['locations'][0]['physicalLocation'])
+
+    def test_batches(self):
+        output = io.StringIO()
+        reporter = report.Reporter(output, batch_size=2)
+        reporter.add('foo.h', 1, 1, 'static-data', 'a')
+        self.assertEqual('', output.getvalue())
+        reporter.add('foo.h', 2, 1, 'static-data', 'b')
+        self.assertEqual('foo.h:1: a\nfoo.h:2: b\n', output.getvalue())
+        reporter.add('foo.h', 3, 1, 'static-data', 'c')
+        reporter.close()
+        self.assertEqual('foo.h:1: a\nfoo.h:2: b\nfoo.h:3: c\n',
+                         output.getvalue())
+
+    def test_unknown_format(self):
+        self.assertRaises(ValueError, report.Reporter, io.StringIO(), 'xml')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,132 @@
+#!/usr/bin/env python
+
+"""Tests for serialize module."""
+
+from __future__ import absolute_import
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from cpp import ast
+from cpp import find_warnings
+from cpp import serialize
+
+
+SOURCE = """
+#include "foo.h"
+#include <vector>
+#define MAX(a, b) ((a) > (b) ? (a) : (b))
+
+namespace ns {
+
+using std::vector;
+
+typedef map<string, vector<int> > Table;
+enum Color { RED, GREEN };
+class Forward;
+
+template <typename T>
+class Foo : public Bar<T>, private Baz {
+ public:
+  Foo(const T& t, int* p = NULL);
+  virtual ~Foo();
+  static int count_;
+  friend class Friendly;
+  struct Inner { int x; } inner_;
+
+ private:
+  vector<pair<int, T*> > items_;
+};
+
+int Foo::Method(int a) const { return a + count_; }
+static const char* const kName = "name";
+
+}  // namespace ns
+
+void free_function(Foo<int>& foo, ...);
+"""
+
+
+def _parse(source, filename='test.h'):
+    builder = ast.builder_from_source(source, filename)
+    return find_warnings.Module(filename,
+                                [n for n in builder.generate() if n])
+
+
+class SerializeTest(unittest.TestCase):
+
+    def assert_round_trip(self, module):
+        result = serialize.loads(serialize.dumps(module))
+        self.assertEqual(module.filename, result.filename)
+        self.assertEqual([str(n) for n in module.ast_list],
+                         [str(n) for n in result.ast_list])
+        self.assertEqual(sorted(module.public_symbols),
+                         sorted(result.public_symbols))
+        return result
+
+    def test_round_trip(self):
+        module = _parse(SOURCE)
+        result = self.assert_round_trip(module)
+
+        # Lazily converted types come out the same too.
+        for node, new_node in zip(module.ast_list, result.ast_list):
+            if isinstance(node, ast.Function):
+                self.assertEqual(str(node.return_type),
+                                 str(new_node.return_type))
+                self.assertEqual(str(node.parameters),
+                                 str(new_node.parameters))
+
+    def test_round_trip_keeps_public_symbols_in_ast_list(self):
+        result = serialize.loads(serialize.dumps(_parse(SOURCE)))
+        self.assertTrue(result.public_symbols)
+        for node in result.public_symbols.values():
+            self.assertTrue(any(node is n for n in result.ast_list))
+
+    def test_round_trip_of_unparsed_module(self):
+        module = find_warnings.Module('missing.h', None)
+        result = serialize.loads(serialize.dumps(module))
+        self.assertEqual('missing.h', result.filename)
+        self.assertEqual(None, result.ast_list)
+        self.assertEqual({}, result.public_symbols)
+
+    def test_round_trip_of_tokens(self):
+        result = serialize.loads(serialize.dumps(_parse(SOURCE)))
+        method = [n for n in result.ast_list if isinstance(n, ast.Method)][0]
+        self.assertEqual(['return', 'a', '+', 'count_', ';'],
+                         [t.name for t in method.body])
+        self.assertEqual(SOURCE.index('return'), method.body[0].start)
+        self.assertEqual(SOURCE.index('return') + 6, method.body[0].end)
+
+    def test_dump_and_load(self):
+        directory = tempfile.mkdtemp()
+        try:
+            filename = os.path.join(directory, 'module.bin')
+            module = _parse(SOURCE)
+            serialize.dump(module, filename)
+            result = serialize.load(filename)
+            self.assertEqual([str(n) for n in module.ast_list],
+                             [str(n) for n in result.ast_list])
+        finally:
+            shutil.rmtree(directory)
+
+    def test_loads_with_bad_magic(self):
+        data = serialize.dumps(_parse(SOURCE))
+        self.assertRaises(serialize.Error, serialize.loads,
+                          b'X' + data[1:])
+
+    def test_loads_with_other_version(self):
+        data = serialize.dumps(_parse(SOURCE))
+        offset = len(serialize.MAGIC)
+        self.assertRaises(serialize.Error, serialize.loads,
+                          data[:offset] + b'\xff' + data[offset + 1:])
+
+    def test_loads_with_truncated_data(self):
+        data = serialize.dumps(_parse(SOURCE))
+        self.assertRaises(serialize.Error, serialize.loads, data[:10])
+        self.assertRaises(serialize.Error, serialize.loads, data[:-1])
+
+
+if __name__ == '__main__':
+    unittest.main()
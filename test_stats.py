@@ -0,0 +1,109 @@
+#!/usr/bin/env python
+
+"""Tests for stats module."""
+
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import io
+import unittest
+
+from cpp import ast
+from cpp import stats
+from cpp import visitor
+
+
+class _Clock(object):
+
+    def __init__(self):
+        self.now = 0.0
+
+    def time(self):
+        return self.now
+
+
+class StatsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = _Clock()
+        self.saved = (stats.time, stats._cpu_time)
+        stats.time = self.clock
+        stats._cpu_time = self.clock.time
+        self.stats = stats.enable()
+
+    def tearDown(self):
+        stats.disable()
+        stats.time, stats._cpu_time = self.saved
+
+    def test_nested_phases(self):
+        stats.start_file('foo.cc')
+        with stats.phase('include resolution'):
+            self.clock.now += 1
+            with stats.phase('symbol table'):
+                self.clock.now += 2
+            self.clock.now += 4
+        self.assertEqual({'include resolution': [5.0, 5.0],
+                          'symbol table': [2.0, 2.0]},
+                         self.stats.files['foo.cc'])
+
+    def test_timed(self):
+        def generate():
+            for i in range(3):
+                self.clock.now += 1
+                yield i
+
+        stats.start_file('foo.cc')
+        items = []
+        for item in stats.timed('parse', generate()):
+            self.clock.now += 10
+            items.append(item)
+        self.assertEqual([0, 1, 2], items)
+        self.assertEqual({'parse': [3.0, 3.0]}, self.stats.files['foo.cc'])
+
+    def test_timed_visitor(self):
+        ast_visitor = visitor.Visitor()
+
+        def callback(token, function, parents):
+            self.clock.now += 1
+
+        stats.timed_visitor(ast_visitor, 'check').add_token_callback(callback)
+        stats.start_file('foo.cc')
+        ast_visitor.walk(
+            ast.builder_from_source('void f() { x; }', 'foo.cc').generate())
+        self.assertEqual({'check': [2.0, 2.0]}, self.stats.files['foo.cc'])
+
+    def test_summary(self):
+        for filename, seconds in [('a.cc', 1), ('b.cc', 3), ('c.cc', 2)]:
+            stats.start_file(filename)
+            with stats.phase('parse'):
+                self.clock.now += seconds
+            with stats.phase('check static_data'):
+                self.clock.now += 1
+        stats.count('module cache hit')
+
+        self.assertEqual([(4.0, 4.0, 'b.cc'), (3.0, 3.0, 'c.cc')],
+                         self.stats.get_slowest_files(2))
+        self.assertEqual([('parse', 6.0, 6.0),
+                          ('check static_data', 3.0, 3.0)],
+                         self.stats.get_phase_totals())
+
+        output = io.StringIO()
+        self.stats.print_summary(output, 1)
+        self.assertIn('module cache: 1 hits, 0 misses', output.getvalue())
+        self.assertIn('b.cc', output.getvalue())
+        self.assertNotIn('c.cc', output.getvalue())
+
+
+class DisabledTest(unittest.TestCase):
+
+    def test_disabled(self):
+        items = [1, 2]
+        self.assertIs(items, stats.timed('parse', items))
+        ast_visitor = visitor.Visitor()
+        self.assertIs(ast_visitor, stats.timed_visitor(ast_visitor, 'check'))
+        with stats.phase('read'):
+            stats.count('module cache hit')
+
+
+if __name__ == '__main__':
+    unittest.main()
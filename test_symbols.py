@@ -79,10 +79,55 @@ class SymbolTableTest(unittest.TestCase):
         self.assertEqual(ns_symbols[3], st.lookup_symbol('foo', bigger))
 
         # Remove ns2 and verify that when looking for foo in ns2 it finds ns1.
-        ns1 = st.namespaces['ns1']
-        del ns1['ns2']
+        removed = [path for path in st.namespace_paths
+                   if path[:2] == ('ns1', 'ns2')]
+        st.namespace_paths.difference_update(removed)
+        for path in list(st.symbols):
+            if path[:2] == ('ns1', 'ns2'):
+                del st.symbols[path]
         self.assertEqual(ns_symbols[1], st.lookup_symbol('foo', ns[:2]))
 
+        # Verify that when looking for foo in ns2 without foo it finds ns1.
+        st = symbols.SymbolTable()
+        ns_symbols = [add_symbol(st, 'foo', None),
+                      add_symbol(st, 'foo', ns[:1]),
+                      add_symbol(st, 'bar', ns[:2])]
+        self.assertEqual(ns_symbols[1], st.lookup_symbol('foo', ns[:2]))
+        self.assertEqual(ns_symbols[1],
+                         st.lookup_symbol('foo', ['ns1', 'missing']))
+
+    def test_find_symbol(self):
+        st = symbols.SymbolTable()
+        self.assertIsNone(st.find_symbol('foo', None))
+        self.assertIsNone(st.find_symbol('foo', ['ns1']))
+        node, module = self._add_symbol(st, 'foo', ['ns1'])
+        self.assertEqual((node, module), st.find_symbol('foo', ['ns1']))
+        self.assertEqual((node, module), st.find_symbol('ns1::foo', None))
+        self.assertIsNone(st.find_symbol('foo', None))
+        self.assertIsNone(st.find_symbol('ns1', None))
+
+    def test_find_symbol_after_unknown_names(self):
+        st = symbols.SymbolTable()
+        node, module = self._add_symbol(st, 'foo', ['ns1'])
+        # Function bodies can push a name for each '::'.
+        stack = ['ns1', 'missing'] + ['x'] * 100000 + ['ns1']
+        self.assertEqual((node, module), st.find_symbol('foo', stack))
+        self.assertEqual((node, module), st.find_symbol('ns1::foo', stack))
+        self.assertIsNone(st.find_symbol('bar', stack))
+
+    def test_find_symbol_of_outer_class(self):
+        st = symbols.SymbolTable()
+        node, module = self._add_symbol(st, 'Outer', None)
+        self.assertEqual((node, module), st.find_symbol('Outer::Inner', None))
+        self.assertEqual((node, module),
+                         st.find_symbol('::Outer::Inner', ['ns1']))
+
+    def test_find_symbol_in_anonymous_namespace(self):
+        st = symbols.SymbolTable()
+        node, module = self._add_symbol(st, 'foo', [None])
+        self.assertEqual((node, module), st.find_symbol('foo', None))
+        self.assertEqual((node, module), st.find_symbol('foo', [None]))
+
     def test_add(self):
         st = symbols.SymbolTable()
         node = object()
@@ -195,5 +240,66 @@ class SymbolTableTest(unittest.TestCase):
                          st.get_namespace(['ns1', 'ns2', 'ns3', 'f']))
 
 
+class LayeredSymbolTableTest(unittest.TestCase):
+
+    def _add_layer(self, st, symbol_names):
+        layer = symbols.SymbolTable()
+        module = object()
+        for name, ns_stack in symbol_names:
+            layer.add_symbol(name, ns_stack, object(), module)
+        st.add_layer(layer)
+        return layer
+
+    def test_lookup_symbol_in_layers(self):
+        st = symbols.SymbolTable()
+        first = self._add_layer(st, [('foo', None), ('bar', ['ns1'])])
+        second = self._add_layer(st, [('baz', ['ns1', 'ns2'])])
+
+        self.assertEqual(first.lookup_symbol('foo', None),
+                         st.lookup_symbol('foo', None))
+        self.assertEqual(first.lookup_symbol('bar', ['ns1']),
+                         st.lookup_symbol('bar', ['ns1', 'ns2']))
+        self.assertEqual(first.lookup_symbol('ns1::bar', None),
+                         st.lookup_symbol('ns1::bar', None))
+        self.assertEqual(second.lookup_symbol('ns2::baz', ['ns1']),
+                         st.lookup_symbol('ns2::baz', ['ns1']))
+        self.assertRaises(symbols.Error, st.lookup_symbol, 'baz', None)
+
+    def test_last_layer_wins(self):
+        st = symbols.SymbolTable()
+        self._add_layer(st, [('foo', None)])
+        second = self._add_layer(st, [('foo', None)])
+        self.assertEqual(second.lookup_symbol('foo', None),
+                         st.lookup_symbol('foo', None))
+
+    def test_own_symbols_first(self):
+        st = symbols.SymbolTable()
+        self._add_layer(st, [('foo', None)])
+        node = object()
+        module = object()
+        self.assertEqual(True, st.add_symbol('foo', None, node, module))
+        self.assertEqual((node, module), st.lookup_symbol('foo', None))
+
+    def test_innermost_namespace_first(self):
+        st = symbols.SymbolTable()
+        inner = self._add_layer(st, [('foo', ['ns1', 'ns2'])])
+        self._add_layer(st, [('foo', ['ns1'])])
+        self.assertEqual(inner.lookup_symbol('foo', ['ns1', 'ns2']),
+                         st.lookup_symbol('foo', ['ns1', 'ns2']))
+
+    def test_layers_are_not_changed(self):
+        st = symbols.SymbolTable()
+        layer = self._add_layer(st, [('foo', ['ns1'])])
+        st.add_symbol('bar', ['ns1'], object(), object())
+        self.assertEqual(['foo'], list(layer.namespaces['ns1']))
+
+    def test_get_namespace(self):
+        st = symbols.SymbolTable()
+        self._add_layer(st, [('foo', ['ns1'])])
+        self._add_layer(st, [('foo', ['ns1', 'ns2'])])
+        self.assertEqual(['ns1', 'ns2'],
+                         st.get_namespace(['ns1', 'ns2', 'f']))
+
+
 if __name__ == '__main__':
     unittest.main()
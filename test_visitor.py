@@ -0,0 +1,135 @@
+#!/usr/bin/env python
+
+"""Tests for visitor module."""
+
+from __future__ import absolute_import
+
+import unittest
+
+from cpp import ast
+from cpp import visitor
+
+
+def _parse(source):
+    builder = ast.builder_from_source(source, '<test>')
+    return [n for n in builder.generate() if n]
+
+
+class _Recorder(object):
+
+    def __init__(self):
+        self.events = []
+
+    def register(self, ast_visitor):
+        ast_visitor.add_callback(ast.Node, self.enter)
+        ast_visitor.add_leave_callback(ast.Class, self.leave)
+        ast_visitor.add_token_callback(self.token)
+
+    def enter(self, node, parents):
+        self.events.append(('enter', node.name,
+                            [p.name for p in parents]))
+
+    def leave(self, node, parents):
+        self.events.append(('leave', node.name,
+                            [p.name for p in parents]))
+
+    def token(self, token, function, parents):
+        self.events.append(('token', token.name, function.name))
+
+    def finish(self, reporter):
+        return len(self.events)
+
+
+class VisitorTest(unittest.TestCase):
+
+    def test_walk_order(self):
+        recorder = _Recorder()
+        ast_visitor = visitor.Visitor()
+        recorder.register(ast_visitor)
+        ast_visitor.walk(_parse("""
+            class Outer {
+              class Inner { int x; };
+              void f() { y; }
+            };
+            int z;
+            """))
+        self.assertEqual([
+            ('enter', 'Outer', []),
+            ('enter', 'Inner', ['Outer']),
+            ('enter', 'x', ['Outer', 'Inner']),
+            ('leave', 'Inner', ['Outer']),
+            ('enter', 'f', ['Outer']),
+            ('token', 'y', 'f'),
+            ('token', ';', 'f'),
+            ('leave', 'Outer', []),
+            ('enter', 'z', []),
+        ], recorder.events)
+
+    def test_leave_without_body(self):
+        recorder = _Recorder()
+        ast_visitor = visitor.Visitor()
+        recorder.register(ast_visitor)
+        ast_visitor.walk(_parse('class Foo;'))
+        self.assertEqual([('enter', 'Foo', []), ('leave', 'Foo', [])],
+                         recorder.events)
+
+    def test_callbacks_by_node_type(self):
+        names = []
+        ast_visitor = visitor.Visitor()
+        ast_visitor.add_callback(ast.Function,
+                                 lambda node, _: names.append(node.name))
+        ast_visitor.walk(_parse("""
+            void f();
+            int x;
+            struct Foo { void g() {} };
+            """))
+        self.assertEqual(['f', 'g'], names)
+
+    def test_run(self):
+        checkers = [_Recorder(), _Recorder()]
+        self.assertEqual(6, visitor.run(checkers, _parse('void f() { y; }')))
+        self.assertEqual(checkers[0].events, checkers[1].events)
+
+    def test_run_streaming(self):
+        consumed = []
+
+        def generate():
+            for node in _parse('int x; int y;'):
+                consumed.append(node.name)
+                yield node
+
+        checker = _Recorder()
+        checker.streaming = True
+        checker.enter = lambda node, _: checker.events.append(
+            list(consumed))
+        visitor.run([checker], generate())
+        self.assertEqual([['x'], ['x', 'y']], checker.events)
+
+    def test_run_not_streaming(self):
+        consumed = []
+
+        def generate():
+            for node in _parse('int x; int y;'):
+                consumed.append(node.name)
+                yield node
+
+        checker = _Recorder()
+        checker.enter = lambda node, _: checker.events.append(
+            list(consumed))
+        visitor.run([checker], generate())
+        self.assertEqual([['x', 'y'], ['x', 'y']], checker.events)
+
+    def test_run_with_parse_error(self):
+        def generate():
+            yield _parse('int x;')[0]
+            raise ast.ParseError('error')
+
+        checker = _Recorder()
+        checker.streaming = True
+        checker.finish = None
+        self.assertRaises(ast.ParseError, visitor.run, [checker], generate())
+        self.assertEqual(1, len(checker.events))
+
+
+if __name__ == '__main__':
+    unittest.main()